@@ -0,0 +1,120 @@
+"""JWT-аутентификация без запроса пользователя на каждый запрос.
+
+Имя, роль, флаги и версия токенов пользователя записываются в токен
+при выдаче. Для проверки, что они не устарели, нужно состояние
+пользователя: оно хранится в LRU-кэше процесса не дольше
+`USER_STATE_CACHE_TIMEOUT` секунд и сбрасывается при сохранении или
+удалении пользователя. Токен с устаревшими данными отклоняется,
+пользователь получает новый через /auth/token/.
+
+Смена роли через /users/ увеличивает `User.token_version`, поэтому
+все выданные раньше токены отзываются сразу, а не по истечении срока.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import LazyUser, User
+from .lru import LRUCache
+
+# Claims токена: проверки прав и автор в ответах отзывов и комментариев.
+TOKEN_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser',
+                'token_version')
+USER_STATE_FIELDS = TOKEN_CLAIMS + ('is_active',)
+# Токены, выданные до появления версии, считаются первой версией.
+INITIAL_TOKEN_VERSION = 1
+
+user_states = LRUCache(
+    settings.USER_STATE_CACHE_SIZE, settings.USER_STATE_CACHE_TIMEOUT
+)
+
+
+def get_user_state(user_id):
+    """Имя, роль, флаги и версия токенов из кэша или одним запросом к БД.
+
+    None, если пользователя нет.
+    """
+    state = user_states.get(user_id)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list(
+            *USER_STATE_FIELDS
+        ).first()
+        if state is None:
+            return None
+        user_states.set(user_id, state)
+    return dict(zip(USER_STATE_FIELDS, state))
+
+
+def forget_user_state(sender, instance, **kwargs):
+    """Обработчик post_save и post_delete пользователя."""
+    user_states.delete(instance.pk)
+
+
+def revoke_tokens(user_id):
+    """Отзывает все выданные пользователю токены."""
+    User.bump_token_version(user_id)
+    user_states.delete(user_id)
+
+
+def connect_signals():
+    for model in (User, LazyUser):
+        post_save.connect(forget_user_state, sender=model)
+        post_delete.connect(forget_user_state, sender=model)
+
+
+def get_access_token(user):
+    """Токен доступа с именем, ролью, флагами и версией пользователя."""
+    token = AccessToken.for_user(user)
+    for claim in TOKEN_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def is_outdated(validated_token, state):
+    """True, если токен отозван или его claims расходятся с состоянием."""
+    version = validated_token.get('token_version', INITIAL_TOKEN_VERSION)
+    if version != state['token_version']:
+        return True
+    return any(
+        claim in validated_token and validated_token[claim] != state[claim]
+        for claim in TOKEN_CLAIMS
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, которая возвращает LazyUser вместо строки из БД.
+
+    Токены без этих claims (выданные раньше) тоже принимаются:
+    данные берутся из состояния пользователя. Версия у них первая,
+    они отзываются первой же сменой роли.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        state = get_user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if not state['is_active']:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        if is_outdated(validated_token, state):
+            raise AuthenticationFailed(
+                'Данные пользователя изменились, получите новый токен.',
+                code='token_outdated',
+            )
+        return LazyUser.from_fields(
+            **{api_settings.USER_ID_FIELD: user_id}, **state
+        )
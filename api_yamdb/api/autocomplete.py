@@ -0,0 +1,179 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from reviews.models import CatalogVersion, Category, Genre, Title
+from .cache import AUTOCOMPLETE_CATALOG
+
+AUTOCOMPLETE_BUDGET = getattr(settings, 'AUTOCOMPLETE_BUDGET_MS', 5) / 1000
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+KINDS = ('titles', 'genres', 'categories')
+# Ключи обрезаются: длинный запрос дополнительно сверяется с текстом.
+MAX_KEY_LENGTH = 32
+WORD_START_RE = re.compile(r'(?<!\w)\w')
+
+
+def normalize(text):
+    """Регистр и ё не важны: 'Ёлки' и 'елки' совпадают."""
+    return text.casefold().replace('ё', 'е')
+
+
+class PrefixIndex:
+    """Отсортированный массив ключей с начала каждого слова названия.
+
+    Поиск: bisect до первого ключа с префиксом и проход вперёд,
+    пока ключи начинаются с префикса.
+    """
+
+    def __init__(self, items):
+        entries = []
+        for name, payload in items:
+            text = normalize(name)
+            entry = (text, payload)
+            for match in WORD_START_RE.finditer(text):
+                start = match.start()
+                entries.append(
+                    (text[start:start + MAX_KEY_LENGTH], entry)
+                )
+        entries.sort(key=lambda item: item[0])
+        self.keys = [key for key, _ in entries]
+        self.entries = [entry for _, entry in entries]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, query, limit, deadline):
+        """До limit совпадений, но не дольше deadline (perf_counter)."""
+        results = []
+        prefix = query[:MAX_KEY_LENGTH]
+        seen = set()
+        keys = self.keys
+        position = bisect_left(keys, prefix)
+        scanned = 0
+        while position < len(keys) and keys[position].startswith(prefix):
+            text, payload = entry = self.entries[position]
+            position += 1
+            scanned += 1
+            if scanned % 64 == 0 and time.perf_counter() > deadline:
+                break
+            if id(entry) in seen or (
+                len(query) > MAX_KEY_LENGTH and query not in text
+            ):
+                continue
+            seen.add(id(entry))
+            results.append(payload)
+            if len(results) >= limit:
+                break
+        return results
+
+
+def load_items():
+    """Пары (название, данные ответа) по видам объектов."""
+    titles = Title.objects.order_by().values_list('id', 'name')
+    items = {
+        'titles': (
+            (name, {'id': pk, 'name': name})
+            for pk, name in titles.iterator()
+        ),
+    }
+    for kind, model in (('genres', Genre), ('categories', Category)):
+        items[kind] = (
+            (name, {'name': name, 'slug': slug})
+            for name, slug in model.objects.order_by().values_list(
+                'name', 'slug'
+            ).iterator()
+        )
+    return items
+
+
+class Autocomplete:
+    """Индекс процесса, перестраивается при смене версии в БД.
+
+    Версия — `CatalogVersion`, общая для всех процессов. Первый индекс
+    строится в запросе, следующие — в фоновом потоке: до замены
+    запросы отвечают по прежнему индексу и не ждут перестройки.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.version = None
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def get_index(self):
+        version = CatalogVersion.get(AUTOCOMPLETE_CATALOG)
+        if self.index is None:
+            with self.lock:
+                if self.index is None:
+                    self.rebuild(version)
+        elif version != self.version and self.lock.acquire(blocking=False):
+            # Блокировку отпустит фоновый поток после замены индекса.
+            try:
+                self.thread = threading.Thread(
+                    target=self.rebuild_in_background,
+                    args=(version,),
+                    daemon=True,
+                )
+                self.thread.start()
+            except RuntimeError:
+                self.lock.release()
+                raise
+        return self.index
+
+    def rebuild_in_background(self, version):
+        try:
+            self.rebuild(version)
+        finally:
+            # У потока своё соединение с БД, его никто больше не закроет.
+            connection.close()
+            self.lock.release()
+
+    def join(self, timeout=None):
+        """Ждёт фоновой перестройки, если она идёт."""
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def clear(self):
+        self.join()
+        with self.lock:
+            self.index = None
+            self.version = None
+
+    def warm_up(self):
+        """Строит индекс при старте процесса, если БД уже доступна.
+
+        Соединение закрывается: при `gunicorn --preload` воркеры
+        унаследовали бы его после fork.
+        """
+        try:
+            self.get_index()
+        except DatabaseError:
+            pass
+        finally:
+            connection.close()
+
+    def rebuild(self, version):
+        index = {
+            kind: PrefixIndex(items) for kind, items in load_items().items()
+        }
+        self.index, self.version = index, version
+
+    def search(self, query, limit=AUTOCOMPLETE_LIMIT):
+        indexes = self.get_index()
+        query = normalize(query).strip()
+        deadline = time.perf_counter() + AUTOCOMPLETE_BUDGET
+        return {
+            kind: indexes[kind].search(query, limit, deadline)
+            if query else []
+            for kind in KINDS
+        }
+
+
+autocomplete = Autocomplete()
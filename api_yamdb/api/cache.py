@@ -0,0 +1,59 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+CATALOG_CACHE_ALIAS = getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60)
+
+# Версия списка произведений для ETag на /titles/: `CatalogVersion` в БД.
+TITLES_CATALOG = 'titles'
+
+# Версия названий произведений, жанров и категорий для автодополнения:
+# `CatalogVersion` в БД.
+AUTOCOMPLETE_CATALOG = 'autocomplete'
+
+
+def get_catalog_cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def _version_key(catalog):
+    return f'catalog:{catalog}:version'
+
+
+def get_catalog_version(catalog):
+    """Текущая версия справочника.
+
+    При потере ключа версия начинается с текущего времени, поэтому
+    записи, закэшированные до вытеснения, больше не будут прочитаны.
+    """
+    cache = get_catalog_cache()
+    key = _version_key(catalog)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_catalog_version(catalog):
+    """Инвалидирует все закэшированные страницы справочника."""
+    cache = get_catalog_cache()
+    key = _version_key(catalog)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def catalog_page_key(catalog, version, host, search, page):
+    """Ключ страницы справочника.
+
+    Хост и параметры запроса приходят от клиента и могут содержать
+    пробелы или быть длиннее 250 символов, что memcached не примет,
+    поэтому в ключ попадает их хеш.
+    """
+    params = hashlib.md5(repr((host, search, page)).encode()).hexdigest()
+    return f'catalog:{catalog}:{version}:{params}'
@@ -0,0 +1,77 @@
+"""Одноразовые коды подтверждения для получения токена.
+
+В БД хранится только SHA-256 от кода и срок его действия
+(`settings.CONFIRMATION_CODE_TIMEOUT` секунд). Код случайный и длинный,
+поэтому медленный хеш не нужен. Проверка — сравнение хешей за
+постоянное время на строке пользователя, которую всё равно нужно
+загрузить; использованный код стирается условным UPDATE, поэтому
+два одновременных запроса не получат по токену.
+"""
+import hashlib
+import hmac
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from reviews.models import User
+
+CODE_BYTES = 16
+CLEAR_BATCH_SIZE = 1000
+CONFIRMATION_CODE_FIELDS = ('confirmation_code', 'confirmation_code_expires')
+
+
+def hash_code(code):
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+def set_confirmation_code(user):
+    """Записывает в пользователя хеш нового кода, без сохранения.
+
+    Возвращает код для письма. Прежний код перестаёт действовать.
+    """
+    code = secrets.token_urlsafe(CODE_BYTES)
+    user.confirmation_code = hash_code(code)
+    user.confirmation_code_expires = timezone.now() + timedelta(
+        seconds=settings.CONFIRMATION_CODE_TIMEOUT
+    )
+    return code
+
+
+def use_confirmation_code(user, code):
+    """Проверяет код пользователя и гасит его. True, если код подошёл."""
+    expected = user.confirmation_code
+    expires = user.confirmation_code_expires
+    if expected is None or expires is None or expires <= timezone.now():
+        return False
+    if not hmac.compare_digest(expected, hash_code(code)):
+        return False
+    return User.objects.filter(
+        pk=user.pk, confirmation_code=expected
+    ).update(confirmation_code=None, confirmation_code_expires=None) == 1
+
+
+def get_expired(now=None):
+    return User.objects.filter(
+        confirmation_code_expires__lte=now or timezone.now()
+    )
+
+
+def clear_expired(batch_size=CLEAR_BATCH_SIZE):
+    """Стирает просроченные коды пачками по индексу срока действия.
+
+    Короткие UPDATE не держат блокировку на всей таблице
+    пользователей. Возвращает число стёртых кодов.
+    """
+    now = timezone.now()
+    cleared = 0
+    while True:
+        ids = list(
+            get_expired(now).values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return cleared
+        cleared += User.objects.filter(pk__in=ids).update(
+            confirmation_code=None, confirmation_code_expires=None
+        )
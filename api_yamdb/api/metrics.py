@@ -0,0 +1,177 @@
+"""Метрики запросов: время ответа, число и время SQL-запросов по view.
+
+Гистограммы хранятся в памяти процесса и отдаются в текстовом формате
+Prometheus; каждый воркер ведёт свои счётчики.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.db import connections
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNRESOLVED_VIEW = 'unresolved'
+# Метод из запроса не попадает в метки как есть: иначе каждый
+# выдуманный метод заводит новые гистограммы.
+KNOWN_METHODS = frozenset(
+    ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+)
+OTHER_METHOD = 'other'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин.
+
+    Счётчики корзин не накопительные: суммы `le` считаются при выводе.
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metric:
+    """Семейство гистограмм одной метрики с метками view и method."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.histograms = {}
+
+    def get(self, labels):
+        histogram = self.histograms.get(labels)
+        if histogram is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+        return histogram
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.help_text}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for (view, method), histogram in sorted(self.histograms.items()):
+            labels = f'view="{view}",method="{method}"'
+            for bound, total in histogram.cumulative():
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {total}'
+                )
+            lines.append(f'{self.name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{self.name}_count{{{labels}}} {histogram.count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = Metric(
+            'api_request_duration_seconds',
+            'Время обработки запроса.',
+            LATENCY_BUCKETS,
+        )
+        self.db_queries = Metric(
+            'api_db_queries',
+            'Количество SQL-запросов на запрос.',
+            QUERY_COUNT_BUCKETS,
+        )
+        self.db_time = Metric(
+            'api_db_duration_seconds',
+            'Время SQL-запросов на запрос.',
+            LATENCY_BUCKETS,
+        )
+
+    def observe(self, view, method, latency, queries, db_time):
+        labels = (view, method)
+        with self.lock:
+            self.latency.get(labels).observe(latency)
+            self.db_queries.get(labels).observe(queries)
+            self.db_time.get(labels).observe(db_time)
+
+    def render(self):
+        with self.lock:
+            lines = (
+                self.latency.render()
+                + self.db_queries.render()
+                + self.db_time.render()
+            )
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self.lock:
+            self.__init__()
+
+
+registry = Registry()
+
+
+class QueryCounter:
+    """Обёртка execute: считает SQL-запросы и их суммарное время."""
+
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def get_view_name(request):
+    """Имя маршрута из router_v1, например `titles-list`."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return UNRESOLVED_VIEW
+    return match.url_name
+
+
+def get_method(request):
+    if request.method in KNOWN_METHODS:
+        return request.method
+    return OTHER_METHOD
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        registry.observe(
+            get_view_name(request),
+            get_method(request),
+            time.perf_counter() - started,
+            counter.count,
+            counter.duration,
+        )
+        return response
@@ -1,8 +1,113 @@
-from rest_framework import filters, mixins, viewsets
+import hashlib
 
+from django.db import transaction
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+from django.utils.cache import parse_etags
+from django.utils.functional import cached_property
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from reviews.models import CatalogVersion
+from .cache import (AUTOCOMPLETE_CATALOG, CATALOG_CACHE_TIMEOUT,
+                    TITLES_CATALOG, bump_catalog_version, catalog_page_key,
+                    get_catalog_cache, get_catalog_version)
 from .permissions import IsAdminUserOrReadOnly
 
 
+class NestedParentMixin:
+    """Родительский объект вложенного ресурса, один запрос на запрос.
+
+    `parent_lookups` сопоставляет поля родителя с аргументами URL,
+    так вся цепочка из URL проверяется одним SELECT.
+    """
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent_queryset(self):
+        return self.parent_model._default_manager.all()
+
+    @cached_property
+    def parent(self):
+        return get_object_or_404(
+            self.get_parent_queryset(),
+            **{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            }
+        )
+
+
+class ConditionalGetMixin:
+    """ETag и If-None-Match для list и retrieve.
+
+    `get_etag_version` возвращает дешёвый счётчик версии ресурса
+    (или None, если проверять нечего). Совпадение с If-None-Match
+    даёт 304 без выборки и сериализации данных. Версия читается
+    до данных, поэтому при гонке клиент получит 200, а не 304.
+
+    По умолчанию версия — `CatalogVersion` справочника `etag_catalog`:
+    она хранится в БД и одна на все процессы.
+    """
+    etag_catalog = None
+
+    def get_etag_version(self):
+        if self.etag_catalog is None:
+            return None
+        return CatalogVersion.get(self.etag_catalog)
+
+    def get_etag(self, request):
+        version = self.get_etag_version()
+        if version is None:
+            return None
+        key = (
+            f'{version}|{request.get_full_path()}|'
+            f'{request.accepted_media_type}'
+        )
+        return f'"{hashlib.md5(key.encode()).hexdigest()}"'
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class ReaderListMixin:
+    """list() через `list_reader` вместо ModelSerializer.
+
+    Ответ совпадает с сериализатором байт в байт, но строится
+    из values_list без создания моделей и полей сериализатора.
+    """
+    list_reader = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.list_reader.rows(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                self.list_reader.represent(page)
+            )
+        return Response(self.list_reader.represent(rows))
+
+
 class ListCreateDestroyViewSet(
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -13,3 +118,40 @@ class ListCreateDestroyViewSet(
     filter_backends = (filters.SearchFilter, )
     search_fields = ('name',)
     lookup_field = 'slug'
+
+    def get_catalog_name(self):
+        return self.basename
+
+    def get_list_cache_key(self, request):
+        params = request.query_params
+        return catalog_page_key(
+            self.get_catalog_name(),
+            get_catalog_version(self.get_catalog_name()),
+            request.get_host(),
+            params.get(api_settings.SEARCH_PARAM, ''),
+            params.get(self.paginator.page_query_param, '1'),
+        )
+
+    def list(self, request, *args, **kwargs):
+        cache = get_catalog_cache()
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+        return Response(data)
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        bump_catalog_version(self.get_catalog_name())
+        CatalogVersion.bump(AUTOCOMPLETE_CATALOG)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Категория и жанры встроены в ответы произведений.
+        instance.titles.update(version=F('version') + 1)
+        super().perform_destroy(instance)
+        bump_catalog_version(self.get_catalog_name())
+        CatalogVersion.bump(TITLES_CATALOG)
+        CatalogVersion.bump(AUTOCOMPLETE_CATALOG)
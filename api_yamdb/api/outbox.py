@@ -0,0 +1,232 @@
+"""Очередь исходящих писем.
+
+Запрос только сохраняет письмо в таблицу OutgoingEmail. Отправка
+зависит от `settings.EMAIL_OUTBOX_MODE`:
+
+* `thread` — фоновая нить в том же процессе после коммита;
+* `worker` — отдельный процесс `python manage.py send_outbox`;
+* `sync` — сразу после коммита в том же потоке (тесты, отладка).
+
+Письма уходят пачками через одно соединение с почтовым сервером,
+неудачные повторяются с экспоненциальной задержкой.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+THREAD = 'thread'
+WORKER = 'worker'
+SYNC = 'sync'
+MAX_BACKOFF = timedelta(hours=1)
+
+
+def get_pending(now=None):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=now or timezone.now(),
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def get_next_attempt():
+    """Время ближайшей повторной отправки или None."""
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    ).order_by('send_after').values_list('send_after', flat=True).first()
+
+
+def get_backoff(attempts):
+    """Задержка перед попыткой attempts + 1: base, 2 * base, 4 * base..."""
+    backoff = timedelta(seconds=settings.EMAIL_OUTBOX_BACKOFF)
+    return min(backoff * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+def build(subject, message, from_email, recipient_list):
+    return OutgoingEmail(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipients='\n'.join(recipient_list),
+    )
+
+
+def enqueue(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь; отправка начнётся после коммита."""
+    email = build(subject, message, from_email, recipient_list)
+    email.save()
+    transaction.on_commit(dispatch)
+    return email
+
+
+def enqueue_many(emails, batch_size=None):
+    """Ставит в очередь письма из словарей аргументов enqueue."""
+    OutgoingEmail.objects.bulk_create(
+        (build(**email) for email in emails), batch_size=batch_size
+    )
+    transaction.on_commit(dispatch)
+
+
+def dispatch():
+    mode = settings.EMAIL_OUTBOX_MODE
+    if mode == SYNC:
+        deliver_all()
+    elif mode == THREAD:
+        outbox_thread.schedule()
+
+
+def send_batch(emails):
+    """Отправляет письма через одно соединение.
+
+    Ошибка одного письма не мешает остальным. Возвращает id
+    отправленных и {id: ошибка} для неотправленных.
+    """
+    sent = []
+    failed = {}
+    try:
+        mail_connection = get_connection(fail_silently=False)
+        mail_connection.open()
+    except Exception as error:
+        return sent, {email.pk: repr(error) for email in emails}
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=email.from_email,
+                to=email.recipients.split('\n'),
+                connection=mail_connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                failed[email.pk] = repr(error)
+            else:
+                sent.append(email.pk)
+    finally:
+        try:
+            mail_connection.close()
+        except Exception:
+            pass
+    return sent, failed
+
+
+def claim(batch_size):
+    """Забирает пачку готовых писем в короткой транзакции.
+
+    Попытка засчитывается, а следующая назначается ещё до отправки:
+    если процесс упадёт посреди пачки, письма вернутся в очередь
+    после задержки. Условный UPDATE по числу попыток не даёт двум
+    процессам `send_outbox` забрать одно письмо и там, где СУБД
+    не умеет SKIP LOCKED.
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        queryset = get_pending(now).order_by('send_after', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        for email in queryset[:batch_size]:
+            if OutgoingEmail.objects.filter(
+                pk=email.pk, attempts=email.attempts
+            ).update(
+                attempts=F('attempts') + 1,
+                send_after=now + get_backoff(email.attempts + 1),
+            ):
+                email.attempts += 1
+                claimed.append(email)
+    return claimed
+
+
+def deliver(batch_size=None):
+    """Отправляет одну пачку писем, готовых к отправке.
+
+    Строки блокируются только на время `claim`, отправка идёт вне
+    транзакции, а результат каждого письма записывается отдельным
+    UPDATE. Возвращает число отправленных и неотправленных.
+    """
+    emails = claim(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    sent, failed = send_batch(emails)
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        sent_at=timezone.now(), last_error=''
+    )
+    for pk, error in failed.items():
+        OutgoingEmail.objects.filter(pk=pk).update(last_error=error)
+    if failed:
+        logger.warning('Не отправлено писем: %s.', len(failed))
+    return len(sent), len(failed)
+
+
+def deliver_all(batch_size=None):
+    """Отправляет пачки, пока есть готовые письма."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
+
+
+class OutboxThread:
+    """Отправка в фоновой нити процесса, для небольших установок.
+
+    Одна нить: запросы, пришедшие во время отправки, схлопываются
+    в один следующий проход. Повторы планируются таймером.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.scheduled = False
+        self.timer = None
+
+    def schedule(self):
+        with self.lock:
+            if self.scheduled:
+                return
+            self.scheduled = True
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='outbox'
+                )
+            return self.executor.submit(self.run)
+
+    def schedule_retry(self, when):
+        delay = max((when - timezone.now()).total_seconds(), 0)
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(delay, self.schedule)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def run(self):
+        with self.lock:
+            self.scheduled = False
+        try:
+            deliver_all()
+            retry_at = get_next_attempt()
+            if retry_at is not None:
+                self.schedule_retry(retry_at)
+        except Exception:
+            logger.exception('Ошибка фоновой отправки писем.')
+        finally:
+            # У нити своё соединение с БД, его нужно закрыть самим.
+            connection.close()
+
+
+outbox_thread = OutboxThread()
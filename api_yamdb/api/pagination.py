@@ -1,5 +1,95 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class UsersPagination(PageNumberPagination):
     page_size = 10
+
+
+class FeedPagination(UsersPagination):
+    """Пагинация лент отзывов и комментариев.
+
+    По умолчанию постраничная. С параметром `?pagination=cursor`
+    включается курсор по (pub_date, id): без COUNT(*) и OFFSET,
+    только переход вперёд по ссылке `next`.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def use_cursor(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_query_param in params
+        )
+
+    def encode_cursor(self, obj):
+        """obj: модель или именованная строка values_list."""
+        position = f'{obj.pub_date.isoformat()}|{obj.id}'
+        return urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            pub_date, pk = urlsafe_b64decode(
+                encoded.encode()
+            ).decode().split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_enabled = self.use_cursor(request)
+        if not self.cursor_enabled:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        queryset = queryset.order_by('pub_date', 'pk')
+        position = self.decode_cursor(request)
+        if position is not None:
+            pub_date, pk = position
+            # pub_date >= X отдаёт индексу диапазон, OR уточняет границу.
+            queryset = queryset.filter(pub_date__gte=pub_date).filter(
+                Q(pub_date__gt=pub_date) | Q(pk__gt=pk)
+            )
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.cursor_page = page[:self.page_size]
+        return self.cursor_page
+
+    def get_next_link(self):
+        if not self.cursor_enabled:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(self.cursor_page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        if not self.cursor_enabled:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
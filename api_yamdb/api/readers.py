@@ -0,0 +1,96 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from reviews.models import Genre
+
+# Тот же формат дат, что и у полей ModelSerializer.
+DATE_FIELD = serializers.DateTimeField()
+
+# Порядок жанров произведения, общий с prefetch в TitleViewSet.
+GENRE_ORDERING = ('id',)
+
+
+class TitleReader:
+    """Список произведений в формате TitleSAFESerializer."""
+    fields = (
+        'id', 'category__name', 'category__slug', 'rating',
+        'name', 'year', 'description',
+    )
+
+    @classmethod
+    def rows(cls, queryset):
+        return queryset.prefetch_related(None).values_list(*cls.fields)
+
+    @staticmethod
+    def represent(rows):
+        genres = defaultdict(list)
+        if rows:
+            title_genres = Genre.objects.filter(
+                titles__in=[row[0] for row in rows]
+            ).order_by(*GENRE_ORDERING).values_list(
+                'titles__id', 'name', 'slug'
+            )
+            for title_id, name, slug in title_genres:
+                genres[title_id].append({'name': name, 'slug': slug})
+        return [
+            {
+                'id': pk,
+                'genre': genres.get(pk, []),
+                'category': (
+                    None if category_slug is None
+                    else {'name': category_name, 'slug': category_slug}
+                ),
+                'rating': None if rating is None else int(rating),
+                'name': name,
+                'year': year,
+                'description': description,
+            }
+            for (pk, category_name, category_slug, rating,
+                 name, year, description) in rows
+        ]
+
+
+class ReviewReader:
+    """Список отзывов в формате ReviewSerializer."""
+    fields = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    @classmethod
+    def rows(cls, queryset):
+        return queryset.values_list(*cls.fields, named=True)
+
+    @staticmethod
+    def represent(rows):
+        to_date = DATE_FIELD.to_representation
+        return [
+            {
+                'id': pk,
+                'text': text,
+                'author': author,
+                'score': score,
+                'pub_date': to_date(pub_date),
+            }
+            for pk, text, author, score, pub_date in rows
+        ]
+
+
+class CommentReader:
+    """Список комментариев в формате CommentSerializer."""
+    fields = ('id', 'text', 'author__username', 'pub_date')
+
+    @classmethod
+    def rows(cls, queryset):
+        return queryset.values_list(*cls.fields, named=True)
+
+    @staticmethod
+    def represent(rows):
+        to_date = DATE_FIELD.to_representation
+        return [
+            {
+                'id': pk,
+                'text': text,
+                'author': author,
+                'pub_date': to_date(pub_date),
+            }
+            for pk, text, author, pub_date in rows
+        ]
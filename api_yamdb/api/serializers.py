@@ -1,12 +1,19 @@
 import re
+from collections import defaultdict
+from itertools import zip_longest
 
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from reviews.models import (
     Category, Comment, Genre, Review, ROLE_CHOICES, Title, User
 )
 
+# Служебные поля Title, которые не отдаются в API.
+TITLE_SERVICE_FIELDS = ('rating_sum', 'rating_count', 'version')
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для модели Category."""
@@ -31,13 +38,11 @@ class TitleSAFESerializer(serializers.ModelSerializer):
 
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = TITLE_SERVICE_FIELDS
 
 
 class TitleReadOnlySerializer(serializers.ModelSerializer):
@@ -55,7 +60,7 @@ class TitleReadOnlySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating',) + TITLE_SERVICE_FIELDS
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -69,17 +74,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def validate(self, data):
-        if not self.context.get('request').method == 'POST':
-            return data
-        author = self.context.get('request').user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        if Review.objects.filter(author=author, title=title_id).exists():
-            raise serializers.ValidationError(
-                'Вы уже оставляли отзыв на это произведение'
-            )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     """Сериализатор объектов класса Comment."""
@@ -94,15 +88,15 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
-class ConfirmationCodeSerializer(serializers.ModelSerializer):
-    """Сериализатор для функции отправки confirmation_code."""
+USERNAME_TAKEN = 'Такое имя уже зарегистрировано'
+EMAIL_TAKEN = 'Такой e-mail уже зарегистрирован'
+
+
+class SignupSerializer(serializers.Serializer):
+    """Поля регистрации без проверок по БД."""
     username = serializers.CharField(max_length=150)
     email = serializers.EmailField(max_length=254)
 
-    class Meta:
-        model = User
-        fields = ('username', 'email')
-
     def validate_username(self, username):
         if username.lower() == 'me':
             raise ValidationError(
@@ -112,22 +106,145 @@ class ConfirmationCodeSerializer(serializers.ModelSerializer):
                 {'message': 'Недопустимые символы в username.'})
         return username
 
-    def validate(slef, data):
+
+class ConfirmationCodeSerializer(SignupSerializer):
+    """Сериализатор для функции отправки confirmation_code."""
+
+    def validate(self, data):
+        """Одним запросом проверяет занятые username и email.
+
+        Уже зарегистрированный пользователь с этими username и email
+        (как есть или в нижнем регистре) сохраняется в `self.user`,
+        его не нужно искать повторно.
+        """
         username = data.get('username')
         email = data.get('email')
-        if (
-            User.objects.filter(username=username).exists()
-            and User.objects.get(username=username).email != email
-        ):
-            raise ValidationError('Такое имя уже зарегистрировано')
-        if (
-            User.objects.filter(email=email).exists()
-            and User.objects.get(email=email).username != username
-        ):
-            raise ValidationError('Такой e-mail уже зарегистрирован')
+        self.user = None
+        username_taken = email_taken = False
+        users = User.objects.filter(
+            Q(username=username)
+            | Q(email=email)
+            | Q(username=username.lower(), email=email.lower())
+        )
+        for user in users:
+            if user.username == username and user.email != email:
+                username_taken = True
+            if user.email == email and user.username != username:
+                email_taken = True
+            if (user.username, user.email) in (
+                (username, email), (username.lower(), email.lower())
+            ):
+                self.user = user
+        if username_taken:
+            raise ValidationError(USERNAME_TAKEN)
+        if email_taken:
+            raise ValidationError(EMAIL_TAKEN)
         return data
 
 
+def iter_chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkSignupSerializer(serializers.ListSerializer):
+    """Массовая регистрация: проверки по БД для всего списка сразу.
+
+    Как и в signup, пользователь с теми же username и email (как есть
+    или в нижнем регистре) считается уже зарегистрированным, а новые
+    создаются в нижнем регистре. Ошибки возвращаются списком той же
+    длины, что и данные. Найденные пользователи сохраняются
+    в `self.existing` по username в нижнем регистре.
+    """
+    max_length = 10000
+    chunk_size = 200
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('child', SignupSerializer())
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > self.max_length:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Не больше {self.max_length} пользователей за раз.'
+                ]
+            })
+        # Ошибки отсюда, в отличие от validate(), DRF отдаёт списком.
+        return self.validate_users(super().to_internal_value(data))
+
+    def get_users(self, usernames, emails):
+        users_by_username = {}
+        users_by_email = {}
+        for username_chunk, email_chunk in zip_longest(
+            iter_chunks(list(usernames), self.chunk_size),
+            iter_chunks(list(emails), self.chunk_size),
+            fillvalue=(),
+        ):
+            users = User.objects.filter(
+                Q(username__in=username_chunk) | Q(email__in=email_chunk)
+            )
+            for user in users:
+                users_by_username[user.username] = user
+                users_by_email[user.email] = user
+        return users_by_username, users_by_email
+
+    def validate_users(self, items):
+        emails_by_username = defaultdict(set)
+        usernames_by_email = defaultdict(set)
+        usernames = set()
+        emails = set()
+        for item in items:
+            username, email = item['username'], item['email']
+            emails_by_username[username.lower()].add(email.lower())
+            usernames_by_email[email.lower()].add(username.lower())
+            usernames.update((username, username.lower()))
+            emails.update((email, email.lower()))
+        users_by_username, users_by_email = self.get_users(usernames, emails)
+
+        self.existing = {}
+        errors = []
+        for item in items:
+            username, email = item['username'], item['email']
+            names = {username, username.lower()}
+            addresses = {email, email.lower()}
+            found = {
+                users_by_username[name]
+                for name in names if name in users_by_username
+            } | {
+                users_by_email[address]
+                for address in addresses if address in users_by_email
+            }
+            same = [
+                user for user in found
+                if user.username in names and user.email in addresses
+            ]
+            error = {}
+            if len(emails_by_username[username.lower()]) > 1 or any(
+                user.username in names for user in found
+                if user not in same
+            ):
+                error['username'] = [USERNAME_TAKEN]
+            if len(usernames_by_email[email.lower()]) > 1 or any(
+                user.email in addresses for user in found
+                if user not in same
+            ):
+                error['email'] = [EMAIL_TAKEN]
+            if not error and same:
+                self.existing[username.lower()] = same[0]
+            errors.append(error)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        # Повторы одной пары в списке создают одного пользователя.
+        return list({
+            item['username'].lower(): {
+                'username': item['username'].lower(),
+                'email': item['email'].lower(),
+            }
+            for item in items
+        }.values())
+
+
 class GetJWTSerializer(serializers.Serializer):
     """Сериализатор для функции отправки токена пользователю."""
     username = serializers.CharField(max_length=150)
@@ -0,0 +1,110 @@
+"""Журнал медленных SQL-запросов с указанием места вызова в коде проекта.
+
+Обёртка execute ставится на каждое новое соединение и пишет
+в логгер `api.slow_queries` запросы дольше
+`settings.SLOW_QUERY_THRESHOLD_MS`, по JSON-объекту на строку.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 5
+WHITESPACE_RE = re.compile(r'\s+')
+# Списки IN (%s, %s, ...) разной длины — один и тот же запрос.
+IN_LIST_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+
+PROJECT_DIR = str(settings.BASE_DIR) + os.sep
+
+
+def normalize_sql(sql):
+    """Убирает литералы и длину списков IN, чтобы группировать запросы."""
+    sql = STRING_RE.sub('%s', sql)
+    sql = NUMBER_RE.sub('%s', sql)
+    sql = IN_LIST_RE.sub('(...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def get_params_shape(params, many):
+    """Типы параметров без значений: в журнал не попадают данные."""
+    if params is None:
+        return None
+    if many:
+        params = list(params)
+        first = params[0] if params else ()
+        return {'rows': len(params), 'row': get_params_shape(first, False)}
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def is_project_frame(filename):
+    return (
+        filename.startswith(PROJECT_DIR)
+        and 'site-packages' not in filename
+        and filename != __file__
+    )
+
+
+def get_function_name(frame):
+    """Имя функции, для методов — с классом экземпляра или cls.
+
+    Так метод миксина показывается как `TitleViewSet.list`.
+    """
+    code = frame.f_code
+    if code.co_argcount and code.co_varnames[0] in ('self', 'cls'):
+        owner = frame.f_locals.get(code.co_varnames[0])
+        if owner is not None:
+            if not isinstance(owner, type):
+                owner = type(owner)
+            return f'{owner.__name__}.{code.co_name}'
+    return code.co_name
+
+
+def get_project_stack(frame):
+    """Кадры кода проекта, начиная с ближайшего к запросу."""
+    stack = []
+    while frame is not None and len(stack) < STACK_DEPTH:
+        filename = frame.f_code.co_filename
+        if is_project_frame(filename):
+            path = os.path.relpath(filename, PROJECT_DIR)
+            stack.append(
+                f'{path}:{frame.f_lineno} in {get_function_name(frame)}'
+            )
+        frame = frame.f_back
+    return stack
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= threshold:
+            stack = get_project_stack(sys._getframe(1))
+            logger.warning(json.dumps({
+                'duration_ms': round(duration, 3),
+                'alias': context['connection'].alias,
+                'sql': normalize_sql(sql),
+                'params': get_params_shape(params, many),
+                'source': stack[0] if stack else None,
+                'stack': stack,
+            }, ensure_ascii=False))
+
+
+def install(sender, connection, **kwargs):
+    """Обработчик connection_created."""
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
@@ -0,0 +1,161 @@
+"""Ограничение частоты запросов алгоритмом token bucket.
+
+Ведро вмещает N токенов и пополняется со скоростью N за период из
+`settings.THROTTLE_RATES` ('N/min'): допускается всплеск до N запросов,
+дальше — в среднем N за период. Состояние ведра — два числа,
+проверка — O(1) без истории запросов, в отличие от SimpleRateThrottle.
+
+Хранилище выбирается `settings.THROTTLE_BACKEND`:
+
+* `local` — словарь в памяти процесса, без сетевых запросов;
+  у каждого процесса свои вёдра;
+* `cache` — кэш `settings.THROTTLE_CACHE_ALIAS`, общий для процессов.
+  Чтение и запись не атомарны: при гонке проходит на несколько
+  запросов больше.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+LOCAL = 'local'
+CACHE = 'cache'
+
+
+class LocalBuckets:
+    """Вёдра в памяти процесса, не больше maxsize.
+
+    Вытесняется давно не использованное ведро: для него это то же,
+    что полностью пополниться.
+    """
+
+    timer = time.monotonic
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        """Берёт токен из ведра: 0, если он был, иначе секунды ожидания."""
+        now = self.timer()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self.buckets.move_to_end(key)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.maxsize:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBuckets:
+    """Вёдра в кэше Django, общие для всех процессов."""
+
+    timer = time.time
+
+    def consume(self, key, capacity, rate):
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        now = self.timer()
+        bucket = cache.get(key)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0
+        else:
+            wait = (1 - tokens) / rate
+        # Полное ведро хранить незачем.
+        cache.set(key, (tokens, now), int((capacity - tokens) / rate) + 1)
+        return wait
+
+
+local_buckets = LocalBuckets(settings.THROTTLE_LOCAL_SIZE)
+cache_buckets = CacheBuckets()
+
+
+def get_buckets():
+    if settings.THROTTLE_BACKEND == CACHE:
+        return cache_buckets
+    return local_buckets
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle с token bucket вместо истории запросов.
+
+    Скорость для scope берётся из `settings.THROTTLE_RATES` при каждом
+    запросе; без неё запросы не ограничиваются.
+    """
+
+    def get_rate(self):
+        return settings.THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        self.delay = get_buckets().consume(
+            key, self.num_requests, self.num_requests / self.duration
+        )
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Ведро на IP-адрес клиента.
+
+    X-Forwarded-For учитывается только при заданном в настройках DRF
+    `NUM_PROXIES`: иначе клиент сменил бы ведро подделкой заголовка.
+    """
+
+    def get_cache_key(self, request, view):
+        return f'throttle:{self.scope}:{self.get_ident(request)}'
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Ведро на username из тела запроса, без учёта регистра."""
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, dict):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return f'throttle:{self.scope}:{username.lower()}'
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
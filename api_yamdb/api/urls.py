@@ -2,8 +2,9 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_jwt_user,
-                    signup_confirmation_code)
+                    ReviewViewSet, TitleViewSet, UserViewSet,
+                    autocomplete_names, bulk_signup, get_jwt_user,
+                    metrics, signup_confirmation_code)
 
 app_name = 'api'
 
@@ -23,6 +24,9 @@ router_v1.register('users', UserViewSet, basename='users')
 
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
+    path('v1/autocomplete/', autocomplete_names, name='autocomplete'),
+    path('v1/_metrics', metrics, name='metrics'),
     path('v1/auth/signup/', signup_confirmation_code, name='signup'),
+    path('v1/auth/signup/bulk/', bulk_signup, name='signup-bulk'),
     path('v1/auth/token/', get_jwt_user, name='token')
 ]
@@ -1,27 +1,46 @@
 from django.conf import settings
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import serializers
 
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import (CatalogVersion, Category, Genre, Review, Title,
+                            User)
+from . import outbox
+from .authentication import get_access_token, revoke_tokens
+from .confirmation import (CONFIRMATION_CODE_FIELDS, set_confirmation_code,
+                           use_confirmation_code)
 from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
-from .pagination import UsersPagination
+from .autocomplete import (AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT,
+                           autocomplete)
+from .cache import AUTOCOMPLETE_CATALOG, TITLES_CATALOG
+from .metrics import PROMETHEUS_CONTENT_TYPE, registry
+from .mixins import (ConditionalGetMixin, ListCreateDestroyViewSet,
+                     NestedParentMixin, ReaderListMixin)
+from .pagination import FeedPagination, UsersPagination
 from .permissions import (AdminModeratorAuthorPermission,
                           AdminOnly, IsAdminUserOrReadOnly)
-from .serializers import (AdminSerializer, CategorySerializer,
+from .readers import (GENRE_ORDERING, CommentReader, ReviewReader,
+                      TitleReader)
+from .serializers import (EMAIL_TAKEN, USERNAME_TAKEN, AdminSerializer,
+                          BulkSignupSerializer, CategorySerializer,
                           CommentSerializer, ConfirmationCodeSerializer,
-                          GenreSerializer, GetJWTSerializer,
-                          ReviewSerializer, TitleReadOnlySerializer,
-                          TitleSAFESerializer, UsersSerializer)
+                          GenreSerializer, GetJWTSerializer, ReviewSerializer,
+                          TitleReadOnlySerializer, TitleSAFESerializer,
+                          UsersSerializer)
+from .throttling import (SignupIPThrottle, SignupUsernameThrottle,
+                         TokenIPThrottle, TokenUsernameThrottle)
+
+# Пользователей и писем в одном INSERT при массовой регистрации.
+BULK_SIGNUP_BATCH_SIZE = 500
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -35,16 +54,42 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     http_method_names = ['get', 'post', 'head', 'patch', 'delete']
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        role = serializer.validated_data.get('role')
+        role_changed = role is not None and role != serializer.instance.role
+        username = serializer.validated_data.get('username')
+        username_changed = (
+            username is not None and username != serializer.instance.username
+        )
+        user = serializer.save()
+        if role_changed:
+            revoke_tokens(user.pk)
+        if username_changed:
+            Title.bump_author_versions(user.pk)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Каскад удалит отзывы и комментарии пользователя
+        # мимо ReviewViewSet и CommentViewSet.
+        Title.remove_author_ratings(instance.pk)
+        Title.bump_author_versions(instance.pk)
+        instance.delete()
+        CatalogVersion.bump(TITLES_CATALOG)
+
     @action(
         detail=False, methods=['get', 'patch', 'post'],
         url_path='me', url_name='me',
         permission_classes=(permissions.IsAuthenticated,)
     )
     def my_profile(self, request):
-        serializer = UsersSerializer(request.user)
+        # Не request.user: LazyUser собран из кэша процесса, и save()
+        # записал бы в БД устаревшие роль и версию токенов.
+        user = User.objects.get(pk=request.user.pk)
+        serializer = UsersSerializer(user)
         if request.method == 'PATCH':
             serializer = UsersSerializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
@@ -62,20 +107,100 @@ class GenreViewSet(ListCreateDestroyViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(Avg('reviews__score'))
+class TitleViewSet(ConditionalGetMixin, ReaderListMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.order_by(*GENRE_ORDERING))
+    )
     permission_classes = (IsAdminUserOrReadOnly, )
     filter_backends = (DjangoFilterBackend, )
     filterset_class = TitleFilter
+    list_reader = TitleReader
+    etag_catalog = TITLES_CATALOG
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return TitleSAFESerializer
         return TitleReadOnlySerializer
 
+    def get_etag_version(self):
+        if self.action == 'list':
+            return super().get_etag_version()
+        return Title.objects.filter(
+            pk=self.kwargs.get('pk')
+        ).order_by().values_list('version', flat=True).first()
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save()
+        CatalogVersion.bump(TITLES_CATALOG)
+        CatalogVersion.bump(AUTOCOMPLETE_CATALOG)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        title = serializer.save()
+        Title.bump_version(title.pk)
+        CatalogVersion.bump(TITLES_CATALOG)
+        CatalogVersion.bump(AUTOCOMPLETE_CATALOG)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        CatalogVersion.bump(TITLES_CATALOG)
+        CatalogVersion.bump(AUTOCOMPLETE_CATALOG)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def autocomplete_names(request):
+    """Автодополнение названий произведений, жанров и категорий."""
+    try:
+        limit = min(
+            int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)),
+            AUTOCOMPLETE_MAX_LIMIT
+        )
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+    results = autocomplete.search(
+        request.query_params.get('q', ''), max(limit, 1)
+    )
+    return Response(results, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, AdminOnly])
+def metrics(request):
+    """Гистограммы времени ответа и SQL-запросов в формате Prometheus."""
+    return HttpResponse(
+        registry.render(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+def get_confirmation_email(user, confirmation_code):
+    """Аргументы outbox.enqueue для письма с кодом подтверждения."""
+    return {
+        'subject': 'Код подтверждения на Yamdb',
+        'message': (f'Привет, {user.username.title()}!\n'
+                    f'Ваш код подтверждения: {confirmation_code}'),
+        'from_email': settings.DEFAULT_ADMIN_EMAIL,
+        'recipient_list': [user.email],
+    }
+
+
+def raise_signup_conflict(username):
+    """Та же ошибка 400, что у ConfirmationCodeSerializer."""
+    if User.objects.filter(username=username).exists():
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [USERNAME_TAKEN]
+        })
+    raise serializers.ValidationError({
+        api_settings.NON_FIELD_ERRORS_KEY: [EMAIL_TAKEN]
+    })
+
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([SignupIPThrottle, SignupUsernameThrottle])
 def signup_confirmation_code(request):
     serializer = ConfirmationCodeSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -83,22 +208,83 @@ def signup_confirmation_code(request):
     username = serializer.validated_data['username'].lower()
     email = serializer.validated_data['email'].lower()
 
-    user = User.objects.get_or_create(username=username, email=email)[0]
-
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        subject='Код подтверждения на Yamdb',
-        message=(f'Привет, {username.title()}!\n'
-                 f'Ваш код подтверждения: {confirmation_code}'),
-        from_email=settings.DEFAULT_ADMIN_EMAIL,
-        recipient_list=[email],
-    )
+    with transaction.atomic():
+        # Пользователя уже нашёл запрос валидации.
+        user = serializer.user
+        created = False
+        if user is None:
+            user = User(username=username, email=email)
+            code = set_confirmation_code(user)
+            try:
+                with transaction.atomic():
+                    user.save()
+                created = True
+            except IntegrityError:
+                # Параллельный запрос успел создать этого пользователя
+                # или занять только username или только email.
+                user = User.objects.filter(
+                    username=username, email=email
+                ).first()
+                if user is None:
+                    raise_signup_conflict(username)
+        if not created:
+            code = set_confirmation_code(user)
+            user.save(update_fields=CONFIRMATION_CODE_FIELDS)
+        # Письмо уходит из очереди после коммита, ответ его не ждёт.
+        outbox.enqueue(**get_confirmation_email(user, code))
 
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, AdminOnly])
+def bulk_signup(request):
+    """Массовая регистрация: список объектов с username и email.
+
+    Новые пользователи создаются пачками, всем из списка, включая
+    уже зарегистрированных с теми же данными, отправляются коды.
+    """
+    serializer = BulkSignupSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    existing = list(serializer.existing.values())
+    new_users = [
+        User(username=item['username'], email=item['email'])
+        for item in serializer.validated_data
+        if item['username'] not in serializer.existing
+    ]
+    emails = [
+        get_confirmation_email(user, set_confirmation_code(user))
+        for user in existing + new_users
+    ]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(
+                new_users, batch_size=BULK_SIGNUP_BATCH_SIZE
+            )
+            User.objects.bulk_update(
+                existing, CONFIRMATION_CODE_FIELDS,
+                batch_size=BULK_SIGNUP_BATCH_SIZE,
+            )
+            outbox.enqueue_many(emails, batch_size=BULK_SIGNUP_BATCH_SIZE)
+    except IntegrityError:
+        # Параллельный запрос зарегистрировал кого-то из списка:
+        # повторная проверка вернёт ошибки по элементам списка.
+        BulkSignupSerializer(data=request.data).is_valid(raise_exception=True)
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Пользователи из списка уже регистрируются, '
+                'повторите запрос.'
+            ]
+        })
+    return Response(
+        {'created': len(new_users), 'existing': len(existing)},
+        status=status.HTTP_200_OK
+    )
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([TokenIPThrottle, TokenUsernameThrottle])
 def get_jwt_user(request):
     serializer = GetJWTSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -108,48 +294,101 @@ def get_jwt_user(request):
 
     user = get_object_or_404(User, username=username)
 
-    if not default_token_generator.check_token(user, confirmation_code):
+    if not use_confirmation_code(user, confirmation_code):
         raise serializers.ValidationError(
             {'Ошибка': 'Неверный код подтверждения.'}
         )
 
-    token = AccessToken.for_user(user)
+    token = get_access_token(user)
     return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(NestedParentMixin, ConditionalGetMixin, ReaderListMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для обьектов модели Review."""
+    parent_model = Title
+    parent_lookups = {'id': 'title_id'}
+    list_reader = ReviewReader
     permission_classes = (AdminModeratorAuthorPermission,)
     serializer_class = ReviewSerializer
-    pagination_class = UsersPagination
+    pagination_class = FeedPagination
     filter_backends = (filters.OrderingFilter,)
     ordering = ('id',)
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
-
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        return self.parent.reviews.select_related('author')
 
+    def get_etag_version(self):
+        return self.parent.version
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @transaction.atomic
+    def perform_create(self, serializer):
+        # Повторный отзыв отсекает ограничение `unique review` в БД:
+        # без гонок и без предварительного SELECT.
+        try:
+            with transaction.atomic():
+                review = serializer.save(
+                    author=self.request.user, title=self.parent
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже оставляли отзыв на это произведение'
+                ]
+            })
+        Title.update_rating(review.title_id, review.score, 1)
+        CatalogVersion.bump(TITLES_CATALOG)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Оценка из get_object() прочитана вне транзакции: при двух
+        # параллельных PATCH обе разницы считались бы от одной оценки.
+        old_score = Review.objects.select_for_update().filter(
+            pk=serializer.instance.pk
+        ).values_list('score', flat=True).get()
+        review = serializer.save()
+        Title.update_rating(review.title_id, review.score - old_score, 0)
+        CatalogVersion.bump(TITLES_CATALOG)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        Title.update_rating(instance.title_id, -instance.score, -1)
+        instance.delete()
+        CatalogVersion.bump(TITLES_CATALOG)
+
+
+class CommentViewSet(NestedParentMixin, ConditionalGetMixin,
+                     ReaderListMixin, viewsets.ModelViewSet):
     """Вьюсет для обьектов модели Comment."""
+    parent_model = Review
+    parent_lookups = {'id': 'review_id', 'title_id': 'title_id'}
+    list_reader = CommentReader
     serializer_class = CommentSerializer
     permission_classes = (AdminModeratorAuthorPermission,)
-    pagination_class = UsersPagination
+    pagination_class = FeedPagination
     filter_backends = (filters.OrderingFilter,)
     ordering = ('id',)
 
+    def get_parent_queryset(self):
+        return Review.objects.select_related('title')
+
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.parent.comments.select_related('author')
+
+    def get_etag_version(self):
+        return self.parent.title.version
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.parent)
+        Title.bump_version(self.parent.title_id)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+        Title.bump_version(self.parent.title_id)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        Title.bump_version(self.parent.title_id)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,6 +64,53 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Страницы категорий и жанров и их версии. При нескольких процессах
+# кэш должен быть общим (Memcached, Redis): в LocMemCache у каждого
+# процесса свои версии, и другие процессы отдают старые страницы.
+CATALOG_CACHE_ALIAS = 'default'
+
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+AUTOCOMPLETE_BUDGET_MS = 5
+
+# Запросы не быстрее порога пишутся в журнал; None отключает журнал.
+SLOW_QUERY_THRESHOLD_MS = 100
+
+# Журнал пишется вне дерева исходников; путь задаёт переменная окружения.
+SLOW_QUERY_LOG = os.environ.get(
+    'SLOW_QUERY_LOG',
+    os.path.join(tempfile.gettempdir(), 'api_yamdb_slow_queries.log'),
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'formatter': 'message',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -97,19 +146,67 @@ DEFAULT_ADMIN_EMAIL = 'yamdb@yamdb.ru'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Отправка писем из очереди: 'thread' — фоновая нить в процессе,
+# 'worker' — команда send_outbox, 'sync' — сразу после коммита.
+EMAIL_OUTBOX_MODE = 'thread'
+
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+# Задержка перед первым повтором в секундах, дальше удваивается.
+EMAIL_OUTBOX_BACKOFF = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # IP клиента для ограничения частоты: число доверенных прокси перед
+    # приложением. 0 — только REMOTE_ADDR, иначе X-Forwarded-For
+    # подделывается клиентом и обходит ограничения.
+    'NUM_PROXIES': 0,
 }
 
 AUTH_USER_MODEL = 'reviews.User'
 
+# Срок действия кода подтверждения из письма, в секундах.
+CONFIRMATION_CODE_TIMEOUT = 30 * 60
+
+# Token bucket для регистрации и получения токена, см. api.throttling.
+THROTTLE_BACKEND = 'local'
+
+THROTTLE_CACHE_ALIAS = 'default'
+
+THROTTLE_LOCAL_SIZE = 100000
+
+THROTTLE_RATES = {
+    'signup_ip': '20/min',
+    'signup_username': '5/min',
+    'token_ip': '30/min',
+    'token_username': '10/min',
+}
+
+# Имя, роль, флаги и версия токенов пользователя для проверки JWT
+# в LRU-кэше процесса. После их смены в другом процессе старый токен
+# принимается не дольше таймаута.
+USER_STATE_CACHE_SIZE = 10000
+
+USER_STATE_CACHE_TIMEOUT = 60
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=29),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -0,0 +1,5 @@
+"""Бенчмарки API.
+
+Запуск из каталога api_yamdb: `python -m benchmarks.<модуль>`.
+Бенчмарки с запросами к БД работают на отдельной временной БД.
+"""
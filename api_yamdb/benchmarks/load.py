@@ -0,0 +1,336 @@
+"""Нагрузочный прогон основных эндпоинтов внутри процесса.
+
+Данные загружаются функциями import_data, запросы идут через тестовый
+клиент Django: сеть не участвует, в задержку входит весь стек
+middleware, DRF и БД. Запускается командой:
+
+    python manage.py benchmark --titles 1000 --requests 200
+"""
+import json
+import math
+import time
+from collections import namedtuple
+from dataclasses import asdict, dataclass
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework.settings import api_settings
+
+from api.authentication import get_access_token
+from api.confirmation import set_confirmation_code
+from api.metrics import QueryCounter
+from reviews.management.commands.import_data import (
+    DEFAULT_BATCH_SIZE, FILES_INTO_MODELS, IMPORT_STAGES, iter_batches,
+    load_chunk, reset_sequences)
+from reviews.models import Title, User
+
+PERCENTILES = (50, 95, 99)
+PUB_DATE = '2022-01-01T00:00:00Z'
+TITLE_PAGES = 5
+
+
+@dataclass
+class Scale:
+    users: int = 1000
+    categories: int = 5
+    genres: int = 20
+    titles: int = 1000
+    genres_per_title: int = 3
+    reviews_per_title: int = 10
+    comments_per_review: int = 2
+
+    def validate(self):
+        if min(asdict(self).values()) < 1:
+            raise ValueError('Все размеры должны быть положительными.')
+        if self.reviews_per_title > self.users:
+            raise ValueError(
+                'Отзывов на произведение не может быть больше, '
+                'чем пользователей: один отзыв от автора.'
+            )
+        if self.genres_per_title > self.genres:
+            raise ValueError('Жанров произведения больше, чем жанров.')
+
+    def review_id(self, title_id, number=0):
+        return (title_id - 1) * self.reviews_per_title + number + 1
+
+
+def synthetic_rows(scale):
+    """Колонки и строки в формате CSV из static/data для каждого файла."""
+    return {
+        'users.csv': (
+            ['id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'],
+            (
+                [idx, f'user{idx}', f'user{idx}@yamdb.fake', 'user', '',
+                 '', '']
+                for idx in range(1, scale.users + 1)
+            ),
+        ),
+        'category.csv': (
+            ['id', 'name', 'slug'],
+            (
+                [idx, f'Категория {idx}', f'category-{idx}']
+                for idx in range(1, scale.categories + 1)
+            ),
+        ),
+        'genre.csv': (
+            ['id', 'name', 'slug'],
+            (
+                [idx, f'Жанр {idx}', f'genre-{idx}']
+                for idx in range(1, scale.genres + 1)
+            ),
+        ),
+        'titles.csv': (
+            ['id', 'name', 'year', 'category'],
+            (
+                [idx, f'Произведение {idx}', 1950 + idx % 70,
+                 idx % scale.categories + 1]
+                for idx in range(1, scale.titles + 1)
+            ),
+        ),
+        'genre_title.csv': (
+            ['id', 'title_id', 'genre_id'],
+            (
+                [(title_id - 1) * scale.genres_per_title + shift + 1,
+                 title_id, (title_id + shift) % scale.genres + 1]
+                for title_id in range(1, scale.titles + 1)
+                for shift in range(scale.genres_per_title)
+            ),
+        ),
+        'review.csv': (
+            ['id', 'title_id', 'text', 'author', 'score', 'pub_date'],
+            (
+                [scale.review_id(title_id, number), title_id,
+                 'Отличное произведение, рекомендую всем',
+                 (title_id + number) % scale.users + 1,
+                 (title_id + number) % 10 + 1, PUB_DATE]
+                for title_id in range(1, scale.titles + 1)
+                for number in range(scale.reviews_per_title)
+            ),
+        ),
+        'comments.csv': (
+            ['id', 'review_id', 'text', 'author', 'pub_date'],
+            (
+                [(review_id - 1) * scale.comments_per_review + number + 1,
+                 review_id, 'Согласен с автором',
+                 (review_id + number) % scale.users + 1, PUB_DATE]
+                for review_id in range(
+                    1, scale.titles * scale.reviews_per_title + 1
+                )
+                for number in range(scale.comments_per_review)
+            ),
+        ),
+    }
+
+
+def seed(scale, chunk_size=10000, batch_size=DEFAULT_BATCH_SIZE):
+    """Загружает синтетические данные так же, как import_data."""
+    scale.validate()
+    files = synthetic_rows(scale)
+    for stage in IMPORT_STAGES:
+        for file in stage:
+            columns, rows = files[file]
+            for index, chunk in enumerate(iter_batches(rows, chunk_size)):
+                load_chunk(file, index, columns, chunk, batch_size, False)
+    reset_sequences(list(FILES_INTO_MODELS.values()))
+    Title.recompute_ratings()
+
+
+class LoadContext:
+    """Данные, которые сценарии готовят до замера."""
+
+    def __init__(self, scale, total):
+        self.scale = scale
+        self.total = total
+        self.client = Client()
+        self.codes = []
+        self.authors = []
+
+    def prepare_codes(self):
+        """Код на каждый запрос: коды одноразовые."""
+        users = [
+            User(username=f'token{idx}', email=f'token{idx}@yamdb.fake')
+            for idx in range(self.total)
+        ]
+        self.codes = [
+            (user.username, set_confirmation_code(user)) for user in users
+        ]
+        User.objects.bulk_create(users, batch_size=DEFAULT_BATCH_SIZE)
+
+    def prepare_authors(self):
+        """Авторы без отзывов: каждому хватает по отзыву на произведение."""
+        count = math.ceil(self.total / self.scale.titles)
+        self.authors = [
+            'Bearer ' + str(get_access_token(User.objects.create(
+                username=f'benchmark{idx}',
+                email=f'benchmark{idx}@yamdb.fake',
+            )))
+            for idx in range(count)
+        ]
+
+    def title_id(self, iteration):
+        return iteration % self.scale.titles + 1
+
+
+Scenario = namedtuple('Scenario', 'name status request prepare')
+
+
+def titles(ctx, iteration):
+    pages = math.ceil(ctx.scale.titles / api_settings.PAGE_SIZE)
+    return ctx.client.get(
+        '/api/v1/titles/', {'page': iteration % min(pages, TITLE_PAGES) + 1}
+    )
+
+
+def titles_filtered(ctx, iteration):
+    scale = ctx.scale
+    return ctx.client.get('/api/v1/titles/', {
+        'genre': f'genre-{iteration % scale.genres + 1}',
+        'category': f'category-{iteration % scale.categories + 1}',
+    })
+
+
+def reviews(ctx, iteration):
+    return ctx.client.get(f'/api/v1/titles/{ctx.title_id(iteration)}/reviews/')
+
+
+def comments(ctx, iteration):
+    title_id = ctx.title_id(iteration)
+    review_id = ctx.scale.review_id(title_id)
+    return ctx.client.get(
+        f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+
+def signup(ctx, iteration):
+    return ctx.client.post(
+        '/api/v1/auth/signup/',
+        {'username': f'signup{iteration}',
+         'email': f'signup{iteration}@yamdb.fake'},
+        content_type='application/json',
+    )
+
+
+def review_post(ctx, iteration):
+    title_id = ctx.title_id(iteration)
+    return ctx.client.post(
+        f'/api/v1/titles/{title_id}/reviews/',
+        {'text': 'Новый отзыв', 'score': iteration % 10 + 1},
+        content_type='application/json',
+        HTTP_AUTHORIZATION=ctx.authors[iteration // ctx.scale.titles],
+    )
+
+
+def token(ctx, iteration):
+    username, code = ctx.codes[iteration]
+    return ctx.client.post(
+        '/api/v1/auth/token/',
+        {'username': username, 'confirmation_code': code},
+        content_type='application/json',
+    )
+
+
+SCENARIOS = (
+    Scenario('titles', 200, titles, None),
+    Scenario('titles_filtered', 200, titles_filtered, None),
+    Scenario('reviews', 200, reviews, None),
+    Scenario('comments', 200, comments, None),
+    Scenario('signup', 200, signup, None),
+    Scenario('token', 200, token, LoadContext.prepare_codes),
+    Scenario('review_post', 201, review_post, LoadContext.prepare_authors),
+)
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу из отсортированного списка."""
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+def run_scenario(scenario, scale, requests, warmup=0):
+    """Прогоняет warmup запросов без замера, затем requests с замером."""
+    ctx = LoadContext(scale, warmup + requests)
+    if scenario.prepare is not None:
+        scenario.prepare(ctx)
+    cache.clear()
+    iterations = iter(range(warmup + requests))
+    for iteration in islice(iterations, warmup):
+        scenario.request(ctx, iteration)
+    latencies = []
+    counter = QueryCounter()
+    started = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        for iteration in iterations:
+            request_started = time.perf_counter()
+            response = scenario.request(ctx, iteration)
+            latencies.append(time.perf_counter() - request_started)
+            if response.status_code != scenario.status:
+                raise AssertionError(
+                    f'{scenario.name}: ответ {response.status_code} '
+                    f'вместо {scenario.status}: {response.content[:200]!r}'
+                )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {'requests': requests}
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = round(
+            percentile(latencies, percent) * 1000, 3
+        )
+    result['queries'] = round(counter.count / requests, 2)
+    result['rps'] = round(requests / elapsed, 1)
+    return result
+
+
+def run(scale, requests, warmup=0, names=None):
+    # Письма остаются в очереди: замеряется ответ signup, а не отправка.
+    # Все запросы идут с одного IP, ограничение частоты отключено.
+    with override_settings(EMAIL_OUTBOX_MODE='worker', THROTTLE_RATES={}):
+        return {
+            scenario.name: run_scenario(scenario, scale, requests, warmup)
+            for scenario in SCENARIOS
+            if names is None or scenario.name in names
+        }
+
+
+def compare(results, baseline, max_regression):
+    """Сравнивает с базовым прогоном: (строки отчёта, регрессии).
+
+    Регрессия — рост p95 больше чем на max_regression процентов
+    или рост числа запросов к БД.
+    """
+    lines = []
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f'{name}: нет в базовом прогоне')
+            continue
+        change = (result['p95_ms'] / base['p95_ms'] - 1) * 100
+        lines.append(
+            f'{name}: p95 {base["p95_ms"]:.2f} → {result["p95_ms"]:.2f} мс '
+            f'({change:+.1f}%), запросов к БД '
+            f'{base["queries"]} → {result["queries"]}'
+        )
+        if change > max_regression:
+            regressions.append(f'{name}: p95 {change:+.1f}%')
+        if result['queries'] > base['queries']:
+            regressions.append(
+                f'{name}: запросов к БД {base["queries"]} → '
+                f'{result["queries"]}'
+            )
+    return lines, regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+
+def save_report(path, scale, results):
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(
+            {'scale': asdict(scale), 'scenarios': results},
+            report_file, ensure_ascii=False, indent=2,
+        )
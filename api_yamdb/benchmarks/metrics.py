@@ -0,0 +1,41 @@
+"""Накладные расходы MetricsMiddleware на один запрос с тремя SQL.
+
+    python -m benchmarks.metrics
+"""
+from .utils import best_of, setup_django, temporary_database
+
+REQUESTS = 10000
+QUERIES = 3
+
+
+def run():
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    from api.metrics import MetricsMiddleware
+
+    request = RequestFactory().get('/api/v1/titles/')
+    request.resolver_match = resolve('/api/v1/titles/')
+
+    def view(request):
+        with connection.cursor() as cursor:
+            for _ in range(QUERIES):
+                cursor.execute('SELECT 1')
+
+    middleware = MetricsMiddleware(view)
+
+    def requests(handler):
+        return lambda: [handler(request) for _ in range(REQUESTS)]
+
+    bare_time = best_of(requests(view)) / REQUESTS
+    metrics_time = best_of(requests(middleware)) / REQUESTS
+    print(f'Без метрик: {bare_time * 1e6:.1f} мкс')
+    print(f'С метриками: {metrics_time * 1e6:.1f} мкс')
+    print(f'Накладные расходы: {(metrics_time - bare_time) * 1e6:.1f} мкс')
+
+
+if __name__ == '__main__':
+    setup_django()
+    with temporary_database():
+        run()
@@ -0,0 +1,55 @@
+"""JSONRenderer против ORJSONRenderer на странице из 1000 произведений.
+
+    python -m benchmarks.renderers
+"""
+from .utils import best_of, setup_django
+
+TITLES = 1000
+
+
+def title_payload(count):
+    """Данные в формате ответа /api/v1/titles/ с кириллицей."""
+    return {
+        'count': count,
+        'next': None,
+        'previous': None,
+        'results': [
+            {
+                'id': idx,
+                'genre': [
+                    {'name': 'Драма', 'slug': 'drama'},
+                    {'name': 'Комедия', 'slug': 'comedy'},
+                ],
+                'category': {'name': 'Фильм', 'slug': 'movie'},
+                'rating': idx % 10 + 1,
+                'name': f'Побег из Шоушенка, часть {idx}',
+                'year': 1994,
+                'description': 'Бухгалтер Энди Дюфрейн обвинён в убийстве '
+                               'собственной жены и её любовника.',
+            }
+            for idx in range(count)
+        ],
+    }
+
+
+def run():
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import ORJSONRenderer, orjson
+
+    if orjson is None:
+        print('orjson не установлен, ORJSONRenderer = JSONRenderer.')
+    data = title_payload(TITLES)
+    json_renderer = JSONRenderer()
+    orjson_renderer = ORJSONRenderer()
+    assert json_renderer.render(data) == orjson_renderer.render(data)
+    json_time = best_of(lambda: json_renderer.render(data), repeat=20)
+    orjson_time = best_of(lambda: orjson_renderer.render(data), repeat=20)
+    print(f'JSONRenderer:   {json_time * 1000:.2f} мс')
+    print(f'ORJSONRenderer: {orjson_time * 1000:.2f} мс')
+    print(f'Ускорение:      {json_time / orjson_time:.1f}x')
+
+
+if __name__ == '__main__':
+    setup_django()
+    run()
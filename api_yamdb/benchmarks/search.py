@@ -0,0 +1,90 @@
+"""Поиск по произведениям: FTS против icontains и автодополнение.
+
+    python -m benchmarks.search --titles 1000000
+"""
+import argparse
+import random
+
+from .utils import best_of, setup_django, temporary_database
+
+SYLLABLES = (
+    'ба', 'ве', 'го', 'да', 'ёж', 'жи', 'за', 'ки', 'ло', 'ма', 'не', 'ор',
+    'пу', 'ра', 'си', 'ту', 'фе', 'ха', 'це', 'чу', 'ша', 'эм', 'юр', 'як',
+)
+
+
+def make_vocabulary(rng, size=50000):
+    """Словарь псевдослов: частота отдельного слова как в живых текстах."""
+    return [
+        ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 5)))
+        for _ in range(size)
+    ]
+
+
+def seed_titles(count, batch_size=10000):
+    """Возвращает словарь, из которого взяты слова."""
+    from reviews.models import Title
+
+    rng = random.Random(0)
+    words = make_vocabulary(rng)
+    for start in range(0, count, batch_size):
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(rng.choices(words, k=3)).capitalize(),
+                year=rng.randint(1900, 2020),
+                description=' '.join(rng.choices(words, k=12)),
+            )
+            for _ in range(start, min(start + batch_size, count))
+        )
+    return words
+
+
+def run(titles):
+    import time
+
+    from api.autocomplete import PrefixIndex, load_items, normalize
+    from reviews.models import Title
+    from reviews.search import search_titles
+
+    words = seed_titles(titles)
+    rng = random.Random(1)
+    queries = (
+        rng.choice(words),
+        ' '.join(rng.choices(words, k=2)),
+        rng.choice(words)[:4],
+    )
+    print(f'Произведений: {titles}')
+    for query in queries:
+        def fts():
+            return list(search_titles(Title.objects.all(), query)[:10])
+
+        def icontains():
+            return list(Title.objects.filter(
+                name__icontains=query.split()[0]
+            )[:10])
+
+        print(
+            f'{query:20} FTS {best_of(fts) * 1000:8.2f} мс   '
+            f'icontains {best_of(icontains) * 1000:8.2f} мс'
+        )
+
+    started = time.perf_counter()
+    index = PrefixIndex(load_items()['titles'])
+    print(
+        f'Индекс автодополнения: {len(index)} ключей '
+        f'за {time.perf_counter() - started:.1f} с'
+    )
+    for query in queries + tuple(query[:2] for query in queries):
+        def complete():
+            return index.search(normalize(query), 10, float('inf'))
+
+        print(f'{query:20} автодополнение {best_of(complete) * 1e6:8.1f} мкс')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=100000)
+    args = parser.parse_args()
+    setup_django()
+    with temporary_database():
+        run(args.titles)
@@ -0,0 +1,53 @@
+"""Сериализаторы против readers на 1000 объектов.
+
+    python -m benchmarks.serializers
+"""
+from .utils import best_of, seed_catalog, setup_django, temporary_database
+
+OBJECTS = 1000
+
+
+def run():
+    from rest_framework.renderers import JSONRenderer
+
+    from api.readers import CommentReader, ReviewReader, TitleReader
+    from api.serializers import (CommentSerializer, ReviewSerializer,
+                                 TitleSAFESerializer)
+    from reviews.models import Comment, Review, Title
+
+    title_id, review_id = seed_catalog(OBJECTS)
+    cases = (
+        ('titles', TitleReader, TitleSAFESerializer,
+         Title.objects.select_related('category').prefetch_related('genre')),
+        ('reviews', ReviewReader, ReviewSerializer,
+         Review.objects.filter(title_id=title_id).select_related(
+             'author'
+         )),
+        ('comments', CommentReader, CommentSerializer,
+         Comment.objects.filter(review_id=review_id).select_related(
+             'author'
+         )),
+    )
+    render = JSONRenderer().render
+    print(f'{"":10}{"serializer, мс":>16}{"reader, мс":>12}{"ускорение":>11}')
+    for name, reader, serializer_class, queryset in cases:
+        def serialize():
+            return render(serializer_class(queryset.all(), many=True).data)
+
+        def read():
+            return render(reader.represent(list(reader.rows(queryset))))
+
+        assert serialize() == read(), f'{name}: ответы отличаются'
+        serializer_time = best_of(serialize)
+        reader_time = best_of(read)
+        print(
+            f'{name:10}{serializer_time * 1000:16.1f}'
+            f'{reader_time * 1000:12.1f}'
+            f'{serializer_time / reader_time:10.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    setup_django()
+    with temporary_database():
+        run()
@@ -0,0 +1,77 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def temporary_database():
+    """Временная БД по правилам тестовой, рабочая не затрагивается."""
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def best_of(func, repeat=5):
+    """Лучшее время из repeat запусков в секундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def seed_catalog(titles=1000, genres_per_title=3):
+    """Произведения с жанрами и категорией, по отзыву и комментарию на каждое.
+
+    Первичные ключи задаются явно: SQLite не возвращает их
+    из bulk_create. Возвращает id первого произведения и отзыва.
+    """
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    ids = range(1, titles + 1)
+    Category.objects.create(id=1, name='Фильм', slug='movie')
+    Genre.objects.bulk_create(
+        Genre(id=idx, name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(1, 11)
+    )
+    Title.objects.bulk_create(
+        Title(
+            id=idx, name=f'Произведение {idx}', year=2000, category_id=1,
+            description='Описание произведения', rating=7.5
+        )
+        for idx in ids
+    )
+    through = Title.genre.through
+    through.objects.bulk_create(
+        through(title_id=idx, genre_id=(idx + shift) % 10 + 1)
+        for idx in ids
+        for shift in range(genres_per_title)
+    )
+    User.objects.bulk_create(
+        User(id=idx, username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in ids
+    )
+    Review.objects.bulk_create(
+        Review(
+            id=idx, title_id=1, author_id=idx, score=7,
+            text='Отличное произведение, рекомендую всем'
+        )
+        for idx in ids
+    )
+    Comment.objects.bulk_create(
+        Comment(id=idx, review_id=1, author_id=idx, text='Согласен с автором')
+        for idx in ids
+    )
+    return 1, 1
@@ -0,0 +1,112 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from benchmarks import load
+from benchmarks.utils import temporary_database
+
+DEFAULT_REQUESTS = 200
+DEFAULT_WARMUP = 20
+DEFAULT_MAX_REGRESSION = 20
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный прогон основных эндпоинтов на временной БД: '
+            'p50/p95/p99, запросы к БД и пропускная способность.')
+
+    def add_arguments(self, parser):
+        for field in fields(load.Scale):
+            parser.add_argument(
+                f'--{field.name.replace("_", "-")}',
+                type=int,
+                default=field.default,
+                help=f'Размер данных (по умолчанию {field.default}).',
+            )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=DEFAULT_REQUESTS,
+            help='Количество замеряемых запросов на сценарий.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=DEFAULT_WARMUP,
+            help='Запросы перед замером.',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=[scenario.name for scenario in load.SCENARIOS],
+            help='Запустить только указанные сценарии.',
+        )
+        parser.add_argument(
+            '--save',
+            help='Сохранить результаты в JSON для сравнения.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого прогона для сравнения.',
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            default=DEFAULT_MAX_REGRESSION,
+            help='Допустимый рост p95 в процентах относительно базового.',
+        )
+
+    def handle(self, *args, **options):
+        scale = load.Scale(**{
+            field.name: options[field.name] for field in fields(load.Scale)
+        })
+        try:
+            scale.validate()
+        except ValueError as error:
+            raise CommandError(error)
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть положительным.')
+        baseline = None
+        if options['baseline']:
+            baseline = load.load_report(options['baseline'])['scenarios']
+
+        setup_test_environment()
+        try:
+            with temporary_database():
+                self.stdout.write('Загрузка данных...')
+                load.seed(scale)
+                results = load.run(
+                    scale, options['requests'], options['warmup'],
+                    options['scenario'],
+                )
+        finally:
+            teardown_test_environment()
+
+        self.write_results(results)
+        if options['save']:
+            load.save_report(options['save'], scale, results)
+            self.stdout.write(f'Результаты сохранены в {options["save"]}.')
+        if baseline is not None:
+            lines, regressions = load.compare(
+                results, baseline, options['max_regression']
+            )
+            for line in lines:
+                self.stdout.write(line)
+            if regressions:
+                raise CommandError(
+                    'Регрессия относительно базового прогона: '
+                    + '; '.join(regressions)
+                )
+
+    def write_results(self, results):
+        self.stdout.write(
+            f'{"сценарий":<16}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"p99, мс":>10}{"SQL":>8}{"запр/с":>10}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<16}{result["p50_ms"]:>10.2f}'
+                f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                f'{result["queries"]:>8}{result["rps"]:>10.1f}'
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.confirmation import CLEAR_BATCH_SIZE, clear_expired
+
+
+class Command(BaseCommand):
+    help = 'Стирает просроченные коды подтверждения пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=CLEAR_BATCH_SIZE,
+            help='Количество пользователей в одном UPDATE.',
+        )
+
+    def handle(self, *args, **options):
+        cleared = clear_expired(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Стёрто кодов подтверждения: {cleared}.')
+        )
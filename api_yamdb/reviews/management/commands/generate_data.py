@@ -0,0 +1,364 @@
+import csv
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Title
+from .import_data import (DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE,
+                          FILES_INTO_MODELS, bump_catalog_versions,
+                          iter_batches, load_chunk, reset_sequences)
+
+COLUMNS = {
+    'users.csv': ['id', 'username', 'email', 'role', 'bio', 'first_name',
+                  'last_name'],
+    'category.csv': ['id', 'name', 'slug'],
+    'genre.csv': ['id', 'name', 'slug'],
+    'titles.csv': ['id', 'name', 'year', 'category'],
+    'genre_title.csv': ['id', 'title_id', 'genre_id'],
+    'review.csv': ['id', 'title_id', 'text', 'author', 'score', 'pub_date'],
+    'comments.csv': ['id', 'review_id', 'text', 'author', 'pub_date'],
+}
+
+# Доли произведений с 1, 2, 3 и 4 жанрами.
+GENRES_PER_TITLE_WEIGHTS = (40, 35, 20, 5)
+MAX_COMMENTS_PER_REVIEW = 1000
+FIRST_YEAR = 1900
+LAST_YEAR = 2022
+# Отзывы и комментарии за последние пять лет до этой даты.
+LAST_DATE = datetime(2022, 12, 31, tzinfo=timezone.utc)
+PERIOD_SECONDS = 5 * 365 * 24 * 3600
+
+WORDS = (
+    'сюжет', 'герой', 'финал', 'атмосфера', 'музыка', 'режиссёр', 'автор',
+    'диалоги', 'темп', 'идея', 'стиль', 'персонажи', 'мир', 'развязка',
+)
+REVIEW_PHRASES = (
+    'Отличное произведение, рекомендую всем.',
+    'Ожидал большего, но в целом неплохо.',
+    'Слабо: {word} не спасает.',
+    'Сильнее всего запомнился {word}.',
+    'Пересматривал несколько раз, {word} на высоте.',
+    'Не моё, хотя {word} интересный.',
+)
+COMMENT_PHRASES = (
+    'Согласен с автором.',
+    'Не согласен, {word} как раз удачный.',
+    'Спасибо за отзыв!',
+    'А мне {word} не понравился.',
+)
+
+
+def zipf_weights(count, exponent):
+    """Веса 1/k^s для рангов 1..count, нормированные к единице."""
+    weights = [rank ** -exponent for rank in range(1, count + 1)]
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+
+class DataGenerator:
+    """Детерминированный генератор строк в формате CSV для import_data.
+
+    У каждого файла свой генератор случайных чисел от общего seed,
+    поэтому строки не зависят от порядка чтения файлов. Память
+    пропорциональна числу произведений, но не отзывов.
+    """
+
+    def __init__(self, seed, users, categories, genres, titles, reviews,
+                 comments_per_review, zipf):
+        self.seed = seed
+        self.users = users
+        self.categories = categories
+        self.genres = genres
+        self.titles = titles
+        self.reviews = reviews
+        self.comments_per_review = comments_per_review
+        self.zipf = zipf
+
+    def random(self, stream):
+        return random.Random(f'{self.seed}:{stream}')
+
+    def text(self, rng, phrases):
+        return ' '.join(
+            rng.choice(phrases).format(word=rng.choice(WORDS))
+            for _ in range(rng.randint(1, 3))
+        )
+
+    def pub_date(self, rng, after=None):
+        start = after or LAST_DATE - timedelta(seconds=PERIOD_SECONDS)
+        span = (LAST_DATE - start).total_seconds()
+        return start + timedelta(seconds=int(rng.random() * span))
+
+    def iter_users(self):
+        for idx in range(1, self.users + 1):
+            yield [idx, f'user{idx}', f'user{idx}@yamdb.fake', 'user', '',
+                   '', '']
+
+    def iter_categories(self):
+        for idx in range(1, self.categories + 1):
+            yield [idx, f'Категория {idx}', f'category-{idx}']
+
+    def iter_genres(self):
+        for idx in range(1, self.genres + 1):
+            yield [idx, f'Жанр {idx}', f'genre-{idx}']
+
+    def iter_titles(self):
+        rng = self.random('titles')
+        category_ids = range(1, self.categories + 1)
+        category_weights = zipf_weights(self.categories, 1)
+        for idx in range(1, self.titles + 1):
+            # Новых произведений больше, чем старых.
+            year = max(LAST_YEAR - int(rng.expovariate(1 / 15)), FIRST_YEAR)
+            category_id = rng.choices(category_ids, category_weights)[0]
+            yield [idx, f'Произведение {idx}', year, category_id]
+
+    def iter_genre_titles(self):
+        rng = self.random('genres')
+        genre_ids = range(1, self.genres + 1)
+        genre_weights = zipf_weights(self.genres, 1)
+        sizes = range(1, len(GENRES_PER_TITLE_WEIGHTS) + 1)
+        pk = 0
+        for title_id in range(1, self.titles + 1):
+            size = min(
+                rng.choices(sizes, GENRES_PER_TITLE_WEIGHTS)[0], self.genres
+            )
+            chosen = set()
+            while len(chosen) < size:
+                chosen.add(rng.choices(genre_ids, genre_weights)[0])
+            for genre_id in sorted(chosen):
+                pk += 1
+                yield [pk, title_id, genre_id]
+
+    def iter_review_counts(self):
+        """Число отзывов по произведениям: закон Ципфа по популярности.
+
+        Популярность перемешана с id. Округление и ограничение «один
+        отзыв от автора» переносят остаток на следующие произведения.
+        """
+        rng = self.random('popularity')
+        ranks = list(range(self.titles))
+        rng.shuffle(ranks)
+        weights = zipf_weights(self.titles, self.zipf)
+        carry = 0.0
+        written = 0
+        for title_id, rank in enumerate(ranks, start=1):
+            share = self.reviews * weights[rank] + carry
+            if title_id == self.titles:
+                # Погрешность float не должна терять последние отзывы.
+                share = self.reviews - written
+            count = min(int(share), self.users)
+            carry = share - count
+            written += count
+            yield title_id, count
+
+    def iter_reviews(self):
+        """Пары (отзыв, комментарии к нему).
+
+        Комментариев на отзыв — распределение Парето: у большинства
+        отзывов их нет, у немногих — сотни.
+        """
+        rng = self.random('reviews')
+        alpha = None
+        if self.comments_per_review:
+            alpha = (
+                self.comments_per_review + 1
+            ) / self.comments_per_review
+        review_pk = comment_pk = 0
+        for title_id, count in self.iter_review_counts():
+            quality = rng.uniform(3, 9)
+            for author_id in rng.sample(range(1, self.users + 1), count):
+                review_pk += 1
+                score = min(max(round(rng.gauss(quality, 2)), 1), 10)
+                pub_date = self.pub_date(rng)
+                review = [
+                    review_pk, title_id, self.text(rng, REVIEW_PHRASES),
+                    author_id, score, pub_date.isoformat(),
+                ]
+                comments = []
+                comment_count = 0
+                if alpha is not None:
+                    # Случайное округление сохраняет среднее.
+                    comment_count = min(
+                        int(rng.paretovariate(alpha) - 1 + rng.random()),
+                        MAX_COMMENTS_PER_REVIEW,
+                    )
+                for _ in range(comment_count):
+                    comment_pk += 1
+                    comments.append([
+                        comment_pk, review_pk,
+                        self.text(rng, COMMENT_PHRASES),
+                        rng.randint(1, self.users),
+                        self.pub_date(rng, after=pub_date).isoformat(),
+                    ])
+                yield review, comments
+
+    def iter_files(self):
+        """Файлы, кроме отзывов и комментариев, в порядке загрузки."""
+        return (
+            ('users.csv', self.iter_users()),
+            ('category.csv', self.iter_categories()),
+            ('genre.csv', self.iter_genres()),
+            ('titles.csv', self.iter_titles()),
+            ('genre_title.csv', self.iter_genre_titles()),
+        )
+
+
+class CSVWriter:
+    """Пишет строки в CSV-файлы каталога, по одному на файл данных."""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.writers = {}
+
+    def write(self, file, rows):
+        writer = self.writers.get(file)
+        if writer is None:
+            csv_file = open(
+                os.path.join(self.path, file), 'w', encoding='utf-8',
+                newline='',
+            )
+            self.files[file] = csv_file
+            writer = self.writers[file] = csv.writer(csv_file)
+            writer.writerow(COLUMNS[file])
+        writer.writerows(rows)
+
+    def close(self):
+        for csv_file in self.files.values():
+            csv_file.close()
+
+
+class DatabaseWriter:
+    """Загружает строки кусками через load_chunk из import_data."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.chunks = {}
+
+    def write(self, file, rows):
+        index = self.chunks.get(file, 0)
+        self.chunks[file] = index + 1
+        load_chunk(
+            file, index, COLUMNS[file], rows, self.batch_size, False
+        )
+
+    def close(self):
+        reset_sequences(list(FILES_INTO_MODELS.values()))
+        Title.recompute_ratings()
+        bump_catalog_versions()
+
+
+class Command(BaseCommand):
+    help = ('Генерирует воспроизводимые данные с реалистичным перекосом: '
+            'в CSV для import_data или сразу в БД.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Каталог для CSV-файлов. Без него данные пишутся в БД.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=100000,
+            help='Всего отзывов, по произведениям — по закону Ципфа.',
+        )
+        parser.add_argument(
+            '--comments-per-review',
+            type=float,
+            default=1.0,
+            help='Среднее число комментариев на отзыв.',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для отзывов по произведениям.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, которое держится в памяти.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT.',
+        )
+
+    def get_generator(self, options):
+        sizes = ('users', 'categories', 'genres', 'titles', 'chunk_size',
+                 'batch_size')
+        for name in sizes:
+            if options[name] < 1:
+                raise CommandError(f'--{name} должен быть положительным.')
+        if options['reviews'] < 0 or options['comments_per_review'] < 0:
+            raise CommandError(
+                'Количество отзывов и комментариев не может быть '
+                'отрицательным.'
+            )
+        if options['reviews'] > options['users'] * options['titles']:
+            raise CommandError(
+                'Отзывов больше, чем пар пользователь — произведение.'
+            )
+        return DataGenerator(
+            seed=options['seed'],
+            users=options['users'],
+            categories=options['categories'],
+            genres=options['genres'],
+            titles=options['titles'],
+            reviews=options['reviews'],
+            comments_per_review=options['comments_per_review'],
+            zipf=options['zipf'],
+        )
+
+    def handle(self, *args, **options):
+        generator = self.get_generator(options)
+        chunk_size = options['chunk_size']
+        if options['output']:
+            os.makedirs(options['output'], exist_ok=True)
+            writer = CSVWriter(options['output'])
+        else:
+            writer = DatabaseWriter(options['batch_size'])
+        self.counts = {}
+        try:
+            for file, rows in generator.iter_files():
+                for chunk in iter_batches(rows, chunk_size):
+                    self.write(writer, file, chunk)
+            self.write_reviews(writer, generator.iter_reviews(), chunk_size)
+        finally:
+            writer.close()
+        for file, count in self.counts.items():
+            self.stdout.write(f'{file}: {count} строк.')
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы.'))
+
+    def write(self, writer, file, rows):
+        writer.write(file, rows)
+        self.counts[file] = self.counts.get(file, 0) + len(rows)
+
+    def write_reviews(self, writer, reviews, chunk_size):
+        """Отзывы пишутся раньше своих комментариев: они ссылаются на них."""
+        review_rows = []
+        comment_rows = []
+        for review, comments in reviews:
+            review_rows.append(review)
+            comment_rows.extend(comments)
+            if len(review_rows) >= chunk_size or (
+                len(comment_rows) >= chunk_size
+            ):
+                self.write(writer, 'review.csv', review_rows)
+                self.write(writer, 'comments.csv', comment_rows)
+                review_rows = []
+                comment_rows = []
+        if review_rows:
+            self.write(writer, 'review.csv', review_rows)
+        if comment_rows:
+            self.write(writer, 'comments.csv', comment_rows)
@@ -1,39 +1,368 @@
 import csv
+import hashlib
+import json
+import multiprocessing
 import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
 
-from reviews.models import (Category, Comment, Genre, Review,
+from api.cache import (AUTOCOMPLETE_CATALOG, TITLES_CATALOG,
+                       bump_catalog_version)
+from reviews.models import (CatalogVersion, Category, Comment, Genre, Review,
                             Title, User)
 
+# Страницы категорий и жанров в кэше (api.mixins) по basename маршрута.
+CACHED_CATALOGS = ('categories', 'genres')
+
 FILES_INTO_MODELS = {
     'users.csv': User,
     'category.csv': Category,
     'genre.csv': Genre,
     'titles.csv': Title,
+    'genre_title.csv': Title.genre.through,
     'review.csv': Review,
     'comments.csv': Comment,
 }
 
+# Этапы загрузки: файлы этапа ссылаются только на предыдущие этапы,
+# поэтому внутри этапа их можно загружать параллельно.
+IMPORT_STAGES = (
+    ('users.csv', 'category.csv', 'genre.csv'),
+    ('titles.csv',),
+    ('genre_title.csv',),
+    ('review.csv',),
+    ('comments.csv',),
+)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 100000
+CHECKPOINT_FILE = 'api_yamdb_import_{}.json'
+
+
+def get_checkpoint_path(dir_path):
+    """Контрольные точки во временном каталоге, вне дерева исходников.
+
+    Имя зависит от каталога CSV: загрузки разных выгрузок не смешаются.
+    """
+    digest = hashlib.md5(dir_path.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), CHECKPOINT_FILE.format(digest))
+
+
+def get_column_map(model, columns):
+    """Сопоставляет колонки CSV с attname полей модели.
+
+    Внешние ключи пишутся напрямую в `<поле>_id`, без запросов к БД.
+    """
+    column_map = {}
+    for column in columns:
+        field = model._meta.get_field(column)
+        column_map[column] = (field.attname, field.is_relation)
+    return column_map
+
+
+def iter_objects(model, rows, column_map):
+    for row in rows:
+        values = {}
+        for column, (attname, is_relation) in column_map.items():
+            value = row[column]
+            if is_relation and value == '':
+                value = None
+            values[attname] = value
+        yield model(**values)
+
+
+def iter_batches(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def keep_auto_now(model):
+    """Сохраняет даты из CSV вместо подстановки текущего времени."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def bump_catalog_versions():
+    """Сообщает о загруженных данных ETag, автодополнению и кэшам.
+
+    Загрузка идёт мимо вьюсетов, которые обычно меняют версии сами.
+    """
+    CatalogVersion.bump(TITLES_CATALOG)
+    CatalogVersion.bump(AUTOCOMPLETE_CATALOG)
+    for catalog in CACHED_CATALOGS:
+        bump_catalog_version(catalog)
+
+
+def iter_chunks(path, chunk_size):
+    """Читает CSV кусками по chunk_size строк: (номер, колонки, строки)."""
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        columns = next(reader, None)
+        if columns is None:
+            return
+        for index, rows in enumerate(iter_batches(reader, chunk_size)):
+            yield index, columns, rows
+
+
+def load_chunk(file, index, columns, rows, batch_size, ignore_conflicts):
+    """Загружает один кусок файла в отдельной транзакции.
+
+    Работает и в основном процессе, и в процессе пула.
+    """
+    model = FILES_INTO_MODELS[file]
+    column_map = get_column_map(model, columns)
+    objects = iter_objects(
+        model, (dict(zip(columns, row)) for row in rows), column_map
+    )
+    with transaction.atomic(), keep_auto_now(model):
+        for batch in iter_batches(objects, batch_size):
+            model.objects.bulk_create(
+                batch, ignore_conflicts=ignore_conflicts
+            )
+    return file, index, len(rows)
+
+
+class Checkpoint:
+    """Журнал загруженных файлов и кусков в JSON-файле.
+
+    Пишется только основным процессом и заменяется атомарно. Номер
+    куска имеет смысл только при том же размере куска, поэтому он
+    хранится вместе с журналом.
+    """
+
+    def __init__(self, path, chunk_size):
+        self.path = path
+        self.resumed = os.path.exists(path)
+        self.data = {'chunk_size': chunk_size, 'files': {}}
+        if self.resumed:
+            with open(path, encoding='utf-8') as checkpoint_file:
+                self.data = json.load(checkpoint_file)
+
+    @property
+    def chunk_size(self):
+        return self.data.get('chunk_size')
+
+    @property
+    def files(self):
+        return self.data.get('files', {})
+
+    def _file(self, file):
+        return self.data['files'].setdefault(
+            file, {'done': False, 'chunks': []}
+        )
+
+    def started(self, file):
+        return file in self.files
+
+    def file_done(self, file):
+        return self.files.get(file, {}).get('done', False)
+
+    def chunk_done(self, file, index):
+        return index in self.files.get(file, {}).get('chunks', ())
+
+    def mark_chunk(self, file, index):
+        self._file(file)['chunks'].append(index)
+        self.save()
+
+    def mark_file(self, file):
+        self._file(file)['done'] = True
+        self.save()
+
+    def save(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(self.data, checkpoint_file)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
 
 class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов в БД.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static/data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк в одной транзакции и контрольной точке.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов загрузки.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help=(
+                'Файл контрольных точек '
+                '(по умолчанию во временном каталоге).'
+            ),
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Игнорировать контрольные точки прошлого запуска.',
+        )
+
+    def get_workers(self, workers):
+        if workers <= 1:
+            return 1
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite не поддерживает параллельную запись, '
+                'загрузка в одном процессе.'
+            ))
+            return 1
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            self.stdout.write(self.style.WARNING(
+                'Параллельная загрузка требует fork, '
+                'загрузка в одном процессе.'
+            ))
+            return 1
+        return workers
+
     def handle(self, *args, **options):
-        csv_files_path = os.path.join(settings.BASE_DIR, 'static/data')
-        dir_path = os.path.abspath(csv_files_path)
-        for file, model in FILES_INTO_MODELS.items():
-            path = os.path.join(dir_path, file)
-            obj_list = []
-            with open(path, encoding='utf-8') as csv_file:
-                for obj_dict in csv.DictReader(csv_file):
-                    if isinstance(model(), Title):
-                        category_id = int(obj_dict['category'])
-                        category = Category.objects.get(id=category_id)
-                        obj_dict['category'] = category
-                    if isinstance(model(), (Review, Comment)):
-                        author_id = int(obj_dict['author'])
-                        author = User.objects.get(id=author_id)
-                        obj_dict['author'] = author
-                    obj_list.append(model(**obj_dict))
-                model.objects.bulk_create(obj_list)
+        dir_path = os.path.abspath(options['path'])
+        checkpoint_path = (
+            options['checkpoint'] or get_checkpoint_path(dir_path)
+        )
+        if options['restart'] and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.batch_size = options['batch_size']
+        self.chunk_size = options['chunk_size']
+        self.checkpoint = Checkpoint(checkpoint_path, self.chunk_size)
+        if self.checkpoint.resumed:
+            if self.checkpoint.chunk_size != self.chunk_size:
+                raise CommandError(
+                    f'Контрольные точки {checkpoint_path} записаны '
+                    f'с --chunk-size {self.checkpoint.chunk_size}: номера '
+                    'кусков не совпадут. Повторите с прежним --chunk-size '
+                    'или начните заново с --restart.'
+                )
+            self.stdout.write('Продолжение прерванной загрузки.')
+        self.stats = {}
+
+        workers = self.get_workers(options['workers'])
+        if workers == 1:
+            for stage in IMPORT_STAGES:
+                self.run_stage(stage, dir_path, self.load_sequential)
+        else:
+            # Дочерние процессы не должны наследовать открытые соединения.
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=connections.close_all,
+            )
+            with pool:
+                for stage in IMPORT_STAGES:
+                    self.run_stage(
+                        stage, dir_path,
+                        lambda tasks: self.load_parallel(pool, workers, tasks)
+                    )
+
+        reset_sequences(list(FILES_INTO_MODELS.values()))
+        Title.recompute_ratings()
+        bump_catalog_versions()
+        self.checkpoint.remove()
         self.stdout.write(self.style.SUCCESS('Данные добавлены в БД.'))
+
+    def iter_tasks(self, files, dir_path):
+        """Куски файлов, ещё не отмеченные в контрольных точках."""
+        for file in files:
+            path = os.path.join(dir_path, file)
+            # Кусок мог успеть закоммититься до падения, но не попасть
+            # в контрольные точки: при повторе дубликаты пропускаются.
+            ignore_conflicts = self.checkpoint.started(file)
+            for index, columns, rows in iter_chunks(path, self.chunk_size):
+                if self.checkpoint.chunk_done(file, index):
+                    continue
+                yield (file, index, columns, rows,
+                       self.batch_size, ignore_conflicts)
+
+    def run_stage(self, stage, dir_path, load):
+        files = []
+        for file in stage:
+            if self.checkpoint.file_done(file):
+                self.stdout.write(f'{file}: уже загружен.')
+            elif not os.path.exists(os.path.join(dir_path, file)):
+                self.stdout.write(self.style.WARNING(f'{file}: нет файла.'))
+            else:
+                files.append(file)
+                self.stats[file] = 0
+        started = time.perf_counter()
+        load(self.iter_tasks(files, dir_path))
+        elapsed = time.perf_counter() - started
+        for file in files:
+            self.checkpoint.mark_file(file)
+            count = self.stats[file]
+            rate = count / elapsed if elapsed else 0
+            self.stdout.write(
+                f'{file}: {count} строк за {elapsed:.2f} с '
+                f'({rate:.0f} строк/с).'
+            )
+
+    def chunk_loaded(self, file, index, count):
+        self.checkpoint.mark_chunk(file, index)
+        self.stats[file] += count
+
+    def load_sequential(self, tasks):
+        for task in tasks:
+            self.chunk_loaded(*load_chunk(*task))
+
+    def load_parallel(self, pool, workers, tasks):
+        """Держит в работе не больше 2 * workers кусков одновременно."""
+        pending = set()
+        for task in tasks:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.chunk_loaded(*future.result())
+            pending.add(pool.submit(load_chunk, *task))
+        for future in wait(pending).done:
+            self.chunk_loaded(*future.result())
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import TITLES_CATALOG
+from reviews.models import CatalogVersion, Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги всех произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.recompute_ratings()
+            CatalogVersion.bump(TITLES_CATALOG)
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинги пересчитаны: {updated}.')
+        )
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import outbox
+
+DEFAULT_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пачками через одно соединение '
+            'с почтовым сервером.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем на одно соединение.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=DEFAULT_INTERVAL,
+            help='Пауза между проверками пустой очереди в секундах.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить готовые письма и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent, failed = outbox.deliver_all(options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, ошибок: {failed}.'
+                    )
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено.')
@@ -0,0 +1,98 @@
+import json
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_TOP = 10
+GROUP_BY = ('sql', 'source')
+
+
+class QueryStats:
+    __slots__ = ('total', 'count', 'max', 'related')
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.related = Counter()
+
+    def add(self, duration, related):
+        self.total += duration
+        self.count += 1
+        self.max = max(self.max, duration)
+        self.related[related] += 1
+
+
+def aggregate(lines, group_by):
+    """Суммирует записи журнала по запросу или по месту вызова.
+
+    Для каждой группы запоминает связанные значения второго ключа:
+    места вызова запроса или запросы из одного места.
+    """
+    related_key = 'source' if group_by == 'sql' else 'sql'
+    stats = {}
+    skipped = 0
+    for line in lines:
+        try:
+            entry = json.loads(line)
+            duration = float(entry['duration_ms'])
+        except (ValueError, KeyError, TypeError):
+            skipped += 1
+            continue
+        key = entry.get(group_by) or '—'
+        stats.setdefault(key, QueryStats()).add(
+            duration, entry.get(related_key) or '—'
+        )
+    return stats, skipped
+
+
+class Command(BaseCommand):
+    help = ('Отчёт по журналу медленных SQL-запросов: '
+            'топ по суммарному времени.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.SLOW_QUERY_LOG,
+            help='Файл журнала медленных запросов.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=DEFAULT_TOP,
+            help='Количество строк отчёта.',
+        )
+        parser.add_argument(
+            '--group-by',
+            choices=GROUP_BY,
+            default='sql',
+            help='Группировать по запросу или по месту вызова.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Журнал {path} не найден.')
+        with open(path, encoding='utf-8') as log_file:
+            stats, skipped = aggregate(log_file, options['group_by'])
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'Пропущено нераспознанных строк: {skipped}.'
+            ))
+        if not stats:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        top = sorted(
+            stats.items(), key=lambda item: item[1].total, reverse=True
+        )[:options['top']]
+        for place, (key, item) in enumerate(top, start=1):
+            self.stdout.write(
+                f'{place}. {item.total:.1f} мс всего, {item.count} раз, '
+                f'в среднем {item.total / item.count:.1f} мс, '
+                f'максимум {item.max:.1f} мс'
+            )
+            self.stdout.write(f'   {key}')
+            for related, count in item.related.most_common(3):
+                self.stdout.write(f'   {count} × {related}')
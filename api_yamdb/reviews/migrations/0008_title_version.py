@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_feed_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Растёт при любом изменении произведения, его отзывов и комментариев', verbose_name='Версия'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+FOLD = "replace(replace({}, 'ё', 'е'), 'Ё', 'Е')"
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE reviews_title_fts USING fts5("
+    "name, description, tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO reviews_title_fts(rowid, name, description) "
+    "SELECT id, {}, {} FROM reviews_title".format(
+        FOLD.format('name'), FOLD.format('description')
+    ),
+    "CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title "
+    "BEGIN INSERT INTO reviews_title_fts(rowid, name, description) "
+    "VALUES (new.id, {}, {}); END".format(
+        FOLD.format('new.name'), FOLD.format('new.description')
+    ),
+    "CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title "
+    "BEGIN DELETE FROM reviews_title_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER reviews_title_fts_update "
+    "AFTER UPDATE OF name, description ON reviews_title "
+    "BEGIN UPDATE reviews_title_fts SET name = {}, description = {} "
+    "WHERE rowid = new.id; END".format(
+        FOLD.format('new.name'), FOLD.format('new.description')
+    ),
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+]
+
+POSTGRESQL_FORWARD = [
+    "ALTER TABLE reviews_title ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', {}), 'A') || "
+    "setweight(to_tsvector('russian', {}), 'B')) STORED".format(
+        FOLD.format('name'), FOLD.format('description')
+    ),
+    'CREATE INDEX reviews_title_search_idx ON reviews_title '
+    'USING GIN (search_vector)',
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX IF EXISTS reviews_title_search_idx',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+]
+
+STATEMENTS = {
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+    'postgresql': (POSTGRESQL_FORWARD, POSTGRESQL_BACKWARD),
+}
+
+
+def run_statements(schema_editor, direction):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements[direction]:
+        schema_editor.execute(sql, params=None)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, 0)
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
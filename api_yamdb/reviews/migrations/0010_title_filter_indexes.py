@@ -0,0 +1,52 @@
+# Generated by Django 3.2 on 2026-10-18 01:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Имя индекса, который Django создаёт для ForeignKey Title.category.
+CATEGORY_INDEX = 'reviews_title_category_id_f88f4f1e'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        # Индекс category_id покрывается title_category_year_idx.
+        # AlterField в SQLite пересоздаёт таблицу и теряет триггеры FTS
+        # из миграции 0009, поэтому удаляется только сам индекс.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f'DROP INDEX IF EXISTS {CATEGORY_INDEX}',
+                    f'CREATE INDEX {CATEGORY_INDEX} '
+                    'ON reviews_title (category_id)',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='title',
+                    name='category',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='titles', to='reviews.category', verbose_name='Категория'),
+                ),
+            ],
+        ),
+        # Автоматическая промежуточная таблица Title.genre: фильтр по жанру
+        # читает title_id прямо из индекса, без обращения к таблице.
+        migrations.RunSQL(
+            'CREATE INDEX title_genre_genre_title_idx '
+            'ON reviews_title_genre (genre_id, title_id)',
+            'DROP INDEX title_genre_genre_title_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_lazy_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=1, help_text='Растёт при смене роли и отзывает выданные токены', verbose_name='Версия токенов'),
+        ),
+    ]
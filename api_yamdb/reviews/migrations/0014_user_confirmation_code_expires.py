@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='confirmation_code_expires',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Код подтверждения действует до'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='confirmation_code',
+            field=models.CharField(help_text='SHA-256 от кода из письма', max_length=255, null=True, verbose_name='Код подтверждения'),
+        ),
+    ]
@@ -1,6 +1,12 @@
+import time
+
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Sum, When)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 
 from .validators import validate_year
 
@@ -55,9 +61,27 @@ class User(AbstractUser):
         'Код подтверждения',
         max_length=255,
         null=True,
-        blank=False
+        blank=False,
+        help_text='SHA-256 от кода из письма'
+    )
+    confirmation_code_expires = models.DateTimeField(
+        'Код подтверждения действует до',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+    token_version = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Версия токенов',
+        help_text='Растёт при смене роли и отзывает выданные токены'
     )
 
+    @classmethod
+    def bump_token_version(cls, user_id):
+        cls.objects.filter(pk=user_id).update(
+            token_version=F('token_version') + 1
+        )
+
     @property
     def is_user(self):
         return self.role == USER
@@ -77,6 +101,33 @@ class User(AbstractUser):
             return self.username
 
 
+class LazyUser(User):
+    """Пользователь из JWT без запроса к БД (api.authentication).
+
+    Заполнены только поля из токена, остальные отложены. Обращение
+    к любому отложенному полю загружает их все одним запросом.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_fields(cls, **fields):
+        names = [
+            field.attname for field in cls._meta.concrete_fields
+            if field.attname in fields
+        ]
+        return cls.from_db(
+            'default', names, [fields[name] for name in names]
+        )
+
+    def refresh_from_db(self, using=None, fields=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields)
+
+
 class Category(models.Model):
     name = models.CharField(max_length=255, verbose_name='Категория')
     slug = models.SlugField(max_length=50, unique=True, verbose_name='slug')
@@ -116,15 +167,136 @@ class Title(models.Model):
         related_name='titles',
         blank=True,
         null=True,
+        db_index=False,
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов'
+    )
+    rating = models.FloatField(
+        default=None,
+        null=True,
+        verbose_name='Рейтинг'
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Версия',
+        help_text='Растёт при любом изменении произведения, '
+                  'его отзывов и комментариев'
+    )
 
     class Meta:
         ordering = ['-year']
+        # Под фильтры TitleFilter: индекс (category, year) заменяет
+        # индекс внешнего ключа и сразу отдаёт строки в порядке -year.
+        indexes = [
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(
+                fields=('category', 'year'), name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def get_rating_update(score_delta, count_delta):
+        """Аргументы UPDATE, сдвигающего агрегаты рейтинга на дельты."""
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return {
+            'version': F('version') + 1,
+            'rating_sum': rating_sum,
+            'rating_count': rating_count,
+            'rating': Case(
+                When(
+                    rating_count__gt=-count_delta,
+                    then=Cast(rating_sum, FloatField()) / rating_count
+                ),
+                default=None,
+                output_field=FloatField()
+            ),
+        }
+
+    @classmethod
+    def update_rating(cls, title_id, score_delta, count_delta):
+        """Инкрементально пересчитывает рейтинг одним UPDATE.
+
+        Вызывается в той же транзакции, что и изменение отзыва.
+        """
+        cls.objects.filter(pk=title_id).update(
+            **cls.get_rating_update(score_delta, count_delta)
+        )
+
+    @classmethod
+    def remove_author_ratings(cls, author_id):
+        """Вычитает оценки автора из рейтингов одним UPDATE.
+
+        Вызывается перед удалением пользователя: каскад удаляет его
+        отзывы мимо update_rating. У автора не больше одного отзыва
+        на произведение.
+        """
+        score = Subquery(
+            Review.objects.filter(
+                title=OuterRef('pk'), author=author_id
+            ).values('score')[:1]
+        )
+        cls.objects.filter(reviews__author=author_id).update(
+            **cls.get_rating_update(-score, -1)
+        )
+
+    @classmethod
+    def bump_version(cls, title_id):
+        cls.objects.filter(pk=title_id).update(version=F('version') + 1)
+
+    @classmethod
+    def bump_author_versions(cls, author_id):
+        """Меняет версию произведений с отзывами и комментариями автора.
+
+        Username автора встроен в ответы отзывов и комментариев, поэтому
+        переименование или удаление автора меняет их ETag.
+        """
+        cls.objects.filter(
+            Q(pk__in=Review.objects.filter(
+                author=author_id
+            ).values('title_id'))
+            | Q(pk__in=Comment.objects.filter(
+                author=author_id
+            ).values('review__title_id'))
+        ).update(version=F('version') + 1)
+
+    @classmethod
+    def recompute_ratings(cls):
+        """Пересчитывает агрегаты рейтинга всех произведений с нуля.
+
+        Версия растёт у всех произведений: рейтинг мог измениться.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return cls.objects.update(
+            version=F('version') + 1,
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(
+                    total=Avg('score', output_field=FloatField())
+                ).values('total'),
+                output_field=FloatField()
+            )
+        )
+
 
 class Review(models.Model):
     text = models.TextField(
@@ -163,6 +335,12 @@ class Review(models.Model):
                 fields=('title', 'author', ),
                 name='unique review'
             )]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        ]
         ordering = ('pub_date',)
 
     def __str__(self):
@@ -195,6 +373,111 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:LENGTH_TEXT]
+
+
+class CatalogVersion(models.Model):
+    """Счётчик версии справочника, общий для всех процессов.
+
+    Растёт при любом изменении справочника и служит валидатором
+    ETag и признаком устаревших индексов в памяти процессов.
+    """
+    name = models.CharField(
+        max_length=50,
+        primary_key=True,
+        verbose_name='Справочник'
+    )
+    version = models.BigIntegerField(verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Версия справочника'
+        verbose_name_plural = 'Версии справочников'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+    @classmethod
+    def get(cls, name):
+        """Текущая версия одним запросом по первичному ключу.
+
+        Пропавшая строка создаётся с версией от текущего времени,
+        поэтому старые версии не повторятся.
+        """
+        version = cls.objects.filter(pk=name).values_list(
+            'version', flat=True
+        ).first()
+        if version is None:
+            version = cls.objects.get_or_create(
+                name=name, defaults={'version': time.time_ns()}
+            )[0].version
+        return version
+
+    @classmethod
+    def bump(cls, name):
+        if not cls.objects.filter(pk=name).update(version=F('version') + 1):
+            cls.objects.get_or_create(
+                name=name, defaults={'version': time.time_ns()}
+            )
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (api.outbox)."""
+    subject = models.CharField(
+        max_length=255,
+        verbose_name='Тема'
+    )
+    message = models.TextField(
+        verbose_name='Текст'
+    )
+    from_email = models.EmailField(
+        max_length=254,
+        verbose_name='Отправитель'
+    )
+    recipients = models.TextField(
+        verbose_name='Получатели',
+        help_text='По одному адресу в строке.'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано'
+    )
+    send_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Отправить не раньше'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попытки отправки'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            # Очередь читает только неотправленные письма.
+            models.Index(
+                fields=('send_after',),
+                name='outbox_pending_idx',
+                condition=models.Q(sent_at__isnull=True)
+            ),
+        ]
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,59 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'reviews_title_fts'
+WORD_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    """Ё и ё ищутся как е, регистр FTS5 сворачивает сам."""
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def get_terms(query):
+    return WORD_RE.findall(fold(query))
+
+
+def search_titles(queryset, query):
+    """Полнотекстовый поиск по названию и описанию с сортировкой по
+    релевантности.
+
+    SQLite: таблица FTS5, которую ведут триггеры (миграция 0009).
+    PostgreSQL: колонка tsvector с GIN-индексом. Остальные СУБД
+    получают icontains без ранжирования.
+    """
+    terms = get_terms(query)
+    if not terms:
+        return queryset.none()
+    if connection.vendor == 'sqlite':
+        # Каждое слово в кавычках: синтаксис FTS5 из запроса не проходит.
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = reviews_title.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+            order_by=['search_rank', '-year', 'id'],
+        )
+    if connection.vendor == 'postgresql':
+        tsquery = "to_tsquery('russian', %s)"
+        match = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.extra(
+            where=[f'reviews_title.search_vector @@ {tsquery}'],
+            params=[match],
+            select={
+                'search_rank': f'ts_rank(reviews_title.search_vector, '
+                               f'{tsquery})'
+            },
+            select_params=[match],
+            order_by=['-search_rank', '-year', 'id'],
+        )
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition)
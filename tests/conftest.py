@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,28 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from api.authentication import user_states
+    from api.autocomplete import autocomplete
+    from api.throttling import local_buckets
+
+    cache.clear()
+    user_states.clear()
+    local_buckets.clear()
+    autocomplete.clear()
+    yield
+    cache.clear()
+    user_states.clear()
+    local_buckets.clear()
+    autocomplete.clear()
+
+
+@pytest.fixture(autouse=True)
+def email_outbox_sync(settings):
+    """Письма из очереди отправляются сразу: тесты проверяют mail.outbox."""
+    settings.EMAIL_OUTBOX_MODE = 'sync'
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08Rating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) is None
+
+        review = create_single_review(user_client, title_id, 'Текст', 4)
+        create_single_review(moderator_client, title_id, 'Текст', 9)
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг обновляется при создании отзыва.'
+        )
+
+        review_url = (
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/'
+        )
+        user_client.patch(review_url, data={'score': 10})
+        assert self.get_rating(admin_client, title_id) == 9, (
+            'Проверьте, что рейтинг обновляется при изменении оценки.'
+        )
+
+        user_client.delete(review_url)
+        assert self.get_rating(admin_client, title_id) == 9, (
+            'Проверьте, что рейтинг обновляется при удалении отзыва.'
+        )
+
+    def test_02_recompute_ratings(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Текст', 7)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        urls = ('/api/v1/titles/', f'/api/v1/titles/{title_id}/')
+        etags = {url: admin_client.get(url)['ETag'] for url in urls}
+
+        call_command('recompute_ratings')
+
+        for url, etag in etags.items():
+            assert admin_client.get(
+                url, HTTP_IF_NONE_MATCH=etag
+            ).status_code == HTTPStatus.OK, (
+                'Проверьте, что `recompute_ratings` меняет ETag '
+                f'ответа `{url}`.'
+            )
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            7, 1, 7.0
+        ), 'Проверьте, что `recompute_ratings` пересчитывает агрегаты.'
+        assert self.get_rating(admin_client, titles[1]['id']) is None
+
+    def test_03_user_delete(self, admin_client, user_client, user,
+                            moderator_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 4)
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 9)
+        create_single_review(user_client, titles[1]['id'], 'Текст', 5)
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        ratings = {
+            title.pk: (title.rating_sum, title.rating_count, title.rating)
+            for title in Title.objects.all()
+        }
+        assert ratings[titles[0]['id']] == (9, 1, 9.0), (
+            'Проверьте, что при удалении пользователя его оценки '
+            'вычитаются из рейтинга.'
+        )
+        assert ratings[titles[1]['id']] == (0, 0, None), (
+            'Проверьте, что рейтинг без отзывов сбрасывается.'
+        )
+
+    def test_04_concurrent_update(self, admin_client, user_client):
+        from api.views import ReviewViewSet
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Текст', 4)
+        get_object = ReviewViewSet.get_object
+
+        def get_stale_object(view):
+            instance = get_object(view)
+            # Параллельный PATCH успел сменить оценку 4 на 6.
+            Review.objects.filter(pk=instance.pk).update(score=6)
+            Title.update_rating(title_id, 2, 0)
+            return instance
+
+        with mock.patch.object(ReviewViewSet, 'get_object', get_stale_object):
+            user_client.patch(
+                f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/',
+                data={'score': 10}
+            )
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (10, 1), (
+            'Проверьте, что при изменении отзыва разница оценок считается '
+            'от оценки в БД, а не от прочитанной до транзакции.'
+        )
@@ -0,0 +1,143 @@
+import warnings
+from http import HTTPStatus
+
+import pytest
+from django.core.cache.backends.base import CacheKeyWarning
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09Queries:
+
+    def create_many_titles(self, admin_client, count):
+        from reviews.models import Genre, Title
+
+        titles, _, _ = create_titles(admin_client)
+        template = Title.objects.get(pk=titles[0]['id'])
+        genres = list(Genre.objects.all())
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}',
+                year=2000,
+                category=template.category
+            )
+            title.genre.set(genres)
+        return titles
+
+    def test_01_title_list_queries(self, client, admin_client,
+                                   django_assert_num_queries):
+        self.create_many_titles(admin_client, 15)
+        # Версия для ETag, COUNT, страница произведений с категориями,
+        # жанры страницы.
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 10
+
+        with django_assert_num_queries(4):
+            client.get('/api/v1/titles/?genre=comedy&category=films')
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles = self.create_many_titles(admin_client, 1)
+        # Версия для ETag, произведение с категорией, жанры.
+        with django_assert_num_queries(3):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+
+    @pytest.mark.parametrize('url', ['/api/v1/categories/', '/api/v1/genres/'])
+    def test_03_catalog_cache(self, url, client, admin_client,
+                              django_assert_num_queries):
+        create_titles(admin_client)
+        client.get(url)
+        with django_assert_num_queries(0):
+            cached = client.get(url)
+
+        admin_client.post(url, data={'name': 'Новый', 'slug': 'new-slug'})
+        response = client.get(url)
+        assert response.json()['count'] == cached.json()['count'] + 1, (
+            f'Проверьте, что после POST-запроса к `{url}` кэш сбрасывается.'
+        )
+
+        admin_client.delete(f'{url}new-slug/')
+        response = client.get(url)
+        assert response.json() == cached.json(), (
+            f'Проверьте, что после DELETE-запроса к `{url}` кэш сбрасывается.'
+        )
+
+    def test_04_nested_parent_chain(self, client, admin_client, user,
+                                    user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Текст', 5
+        ).json()
+        create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'Комментарий'
+        )
+        url = '/api/v1/titles/{}/reviews/{}/comments/'
+        response = client.get(url.format(titles[0]['id'], review['id']))
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url.format(titles[1]['id'], review['id']))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву не отдаются по адресу '
+            'чужого произведения.'
+        )
+        response = user_client.post(
+            url.format(titles[1]['id'], review['id']), data={'text': 'Т'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    # Родитель, COUNT(*) и страница вместе с авторами.
+    FEED_QUERY_BUDGET = 3
+
+    def create_feed(self, admin_client, django_user_model, count):
+        from reviews.models import Comment, Review
+
+        titles, _, _ = create_titles(admin_client)
+        first_review = None
+        for idx in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                author=author, title_id=titles[0]['id'],
+                text=f'Отзыв {idx}', score=5
+            )
+            first_review = first_review or review
+            Comment.objects.create(
+                author=author, review=first_review,
+                text=f'Комментарий {idx}'
+            )
+        return titles[0]['id'], first_review.id
+
+    def test_05_feed_query_budget(self, client, admin_client,
+                                  django_user_model,
+                                  django_assert_max_num_queries):
+        title_id, review_id = self.create_feed(
+            admin_client, django_user_model, 12
+        )
+        urls = (
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        )
+        for url in urls:
+            with django_assert_max_num_queries(self.FEED_QUERY_BUDGET):
+                response = client.get(url)
+            assert len(response.json()['results']) == 10
+            with django_assert_max_num_queries(self.FEED_QUERY_BUDGET):
+                client.get(url, {'pagination': 'cursor'})
+
+    @pytest.mark.parametrize('search', ['научная фантастика', 'ф' * 300])
+    def test_06_catalog_cache_key(self, search, client, admin_client,
+                                  django_assert_num_queries):
+        create_titles(admin_client)
+        url = '/api/v1/genres/'
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            client.get(url, {'search': search})
+            with django_assert_num_queries(0):
+                response = client.get(url, {'search': search})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ключ кэша допустим для memcached при любом '
+            'значении `search`.'
+        )
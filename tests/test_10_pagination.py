@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_review_cursor(self, client, admin_client,
+                              django_user_model):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for idx in range(25):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                author=author, title_id=titles[0]['id'],
+                text=f'Отзыв {idx}', score=5
+            )
+        # Одинаковые pub_date не должны терять или дублировать отзывы.
+        first = Review.objects.order_by('pk').first()
+        Review.objects.filter(pk__lt=first.pk + 13).update(
+            pub_date=first.pub_date
+        )
+
+        response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что курсорная пагинация не считает COUNT(*).'
+        )
+        seen = [review['id'] for review in data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            seen.extend(review['id'] for review in data['results'])
+        expected = list(Review.objects.order_by(
+            'pub_date', 'pk'
+        ).values_list('pk', flat=True))
+        assert seen == expected, (
+            'Проверьте, что курсор по (pub_date, id) отдаёт все отзывы '
+            'по одному разу и по порядку.'
+        )
+
+        response = client.get(url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        response = client.get(url)
+        assert response.json()['count'] == 25
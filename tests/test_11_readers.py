@@ -0,0 +1,68 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Readers:
+
+    def test_01_readers_match_serializers(self, admin_client, admin,
+                                          user_client, user,
+                                          moderator_client, moderator):
+        from api.readers import CommentReader, ReviewReader, TitleReader
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitleSAFESerializer)
+        from reviews.models import Comment, Review, Title
+
+        create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        Title.objects.create(name='Без категории', year=2000)
+        cases = (
+            (TitleReader, TitleSAFESerializer,
+             Title.objects.select_related('category').prefetch_related(
+                 'genre'
+             )),
+            (ReviewReader, ReviewSerializer,
+             Review.objects.select_related('author')),
+            (CommentReader, CommentSerializer,
+             Comment.objects.select_related('author')),
+        )
+        renderer = JSONRenderer()
+        for reader, serializer_class, queryset in cases:
+            expected = serializer_class(queryset, many=True).data
+            actual = reader.represent(list(reader.rows(queryset)))
+            assert renderer.render(actual) == renderer.render(expected), (
+                f'Проверьте, что {reader.__name__} отдаёт тот же JSON, '
+                f'что и {serializer_class.__name__}.'
+            )
+
+    def test_02_title_genre_order(self):
+        from api.readers import TitleReader
+        from api.serializers import TitleSAFESerializer
+        from api.views import TitleViewSet
+        from reviews.models import Genre, Title
+
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(4)
+        ]
+        title = Title.objects.create(name='Много жанров', year=2000)
+        # Связи добавляются не по порядку id жанров.
+        for genre in reversed(genres):
+            title.genre.add(genre)
+
+        queryset = TitleViewSet.queryset.all()
+        expected = TitleSAFESerializer(queryset, many=True).data
+        actual = TitleReader.represent(list(TitleReader.rows(queryset)))
+        renderer = JSONRenderer()
+        assert renderer.render(actual) == renderer.render(expected), (
+            'Проверьте, что жанры произведения идут в одном порядке '
+            'в TitleReader и в TitleSAFESerializer.'
+        )
+        assert [genre['slug'] for genre in actual[0]['genre']] == [
+            genre.slug for genre in genres
+        ], 'Проверьте, что порядок жанров произведения задан явно.'
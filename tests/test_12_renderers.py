@@ -0,0 +1,44 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+
+
+def test_01_renderer_matches_json_renderer():
+    data = {
+        'name': 'Война и мир\u2028строка\u2029',
+        'lazy': gettext_lazy('Пользователь'),
+        'created': datetime.datetime(
+            2023, 6, 24, 13, 21, 5, 123456, tzinfo=timezone.utc
+        ),
+        'date': datetime.date(2023, 6, 24),
+        'rating': decimal.Decimal('7.50'),
+        'uuid': uuid.UUID(int=1),
+        'items': (1, 2.5, None, True),
+        1: 'ключ-число',
+    }
+    for media_type in (None, 'application/json; indent=4'):
+        assert ORJSONRenderer().render(data, media_type) == (
+            JSONRenderer().render(data, media_type)
+        ), 'Проверьте, что ORJSONRenderer отдаёт тот же JSON.'
+    assert ORJSONRenderer().render(None) == b''
+
+
+def test_02_parser_matches_json_parser():
+    body = '{"name": "Ёжик в тумане", "year": 1975, "genre": ["drama"]}'
+    assert ORJSONParser().parse(io.BytesIO(body.encode())) == (
+        JSONParser().parse(io.BytesIO(body.encode()))
+    )
+    for broken in (b'{"name": ', b'{"score": NaN}'):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(broken))
@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from api.cache import TITLES_CATALOG
+from reviews.models import CatalogVersion
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    def assert_not_modified(self, client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+    def assert_modified(self, client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения данных GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+        return response['ETag']
+
+    def test_01_titles(self, client, admin_client, user_client, user,
+                       django_assert_max_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        urls = ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/')
+        for url in urls:
+            etag = client.get(url)['ETag']
+            with django_assert_max_num_queries(1):
+                self.assert_not_modified(client, url, etag)
+            user_client.patch(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/',
+                data={'score': 10}
+            )
+            self.assert_modified(client, url, etag)
+
+        response = client.get('/api/v1/titles/', {'year': 1984})
+        assert response['ETag'] != client.get('/api/v1/titles/')['ETag'], (
+            'Проверьте, что ETag зависит от параметров запроса.'
+        )
+
+    def test_02_feeds(self, client, admin_client, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        urls = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            review_url,
+            f'{review_url}comments/',
+            f'{review_url}comments/{comments[0]["id"]}/',
+        )
+        etags = {url: client.get(url)['ETag'] for url in urls}
+        for url, etag in etags.items():
+            self.assert_not_modified(client, url, etag)
+
+        user_client.patch(
+            f'{review_url}comments/{comments[0]["id"]}/',
+            data={'text': 'Исправленный комментарий'}
+        )
+        for url, etag in etags.items():
+            etags[url] = self.assert_modified(client, url, etag)
+
+        user_client.patch(review_url, data={'text': 'Исправленный отзыв'})
+        for url, etag in etags.items():
+            self.assert_modified(client, url, etag)
+
+    def feed_urls(self, titles, reviews):
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        return (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'{review_url}comments/',
+        )
+
+    def test_03_author_rename(self, client, admin_client, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        etags = {
+            url: client.get(url)['ETag']
+            for url in self.feed_urls(titles, reviews)
+        }
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что переименование автора меняет ETag '
+                f'ответа `{url}`: в нём есть username.'
+            )
+            assert 'renamed' in response.content.decode()
+
+    def test_04_author_delete(self, client, admin_client, user_client, user,
+                              moderator, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {moderator: moderator_client}
+        )
+        user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/',
+            data={'text': 'Комментарий удаляемого автора'}
+        )
+        etags = {
+            url: client.get(url)['ETag']
+            for url in self.feed_urls(titles, reviews)
+        }
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        for url, etag in etags.items():
+            self.assert_modified(client, url, etag)
+
+    def test_05_title_list_shared_version(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        cache.clear()
+        self.assert_not_modified(client, url, etag)
+        assert CatalogVersion.objects.filter(pk=TITLES_CATALOG).exists(), (
+            'Проверьте, что версия списка произведений хранится в БД '
+            'и одна на все процессы.'
+        )
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    def search(self, client, query, **params):
+        response = client.get('/api/v1/titles/', {'search': query, **params})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Ёлки',
+            'year': 2010,
+            'genre': ['comedy'],
+            'category': 'films',
+            'description': 'Новогодняя комедия про терминатор-ёлку',
+        })
+
+        assert self.search(client, 'ТЕРМИНАТОР') == ['Терминатор', 'Ёлки'], (
+            'Проверьте, что поиск не зависит от регистра и сортирует '
+            'результаты по релевантности: совпадение в названии выше.'
+        )
+        assert self.search(client, 'елки') == ['Ёлки'], (
+            'Проверьте, что при поиске `ё` и `е` не различаются.'
+        )
+        assert self.search(client, 'креп оре') == ['Крепкий орешек'], (
+            'Проверьте, что поиск находит слова по началу.'
+        )
+        assert self.search(client, 'терминатор', genre='horror') == [
+            'Терминатор'
+        ]
+        assert self.search(client, '"*') == []
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Рэмбо'}
+        )
+        assert self.search(client, 'рэмбо') == ['Рэмбо'], (
+            'Проверьте, что поисковый индекс обновляется при изменении.'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert self.search(client, 'рэмбо') == []
+
+    def test_02_name_substring(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/', {'name': 'ерминатор'})
+        assert [title['name'] for title in response.json()['results']] == [
+            'Терминатор'
+        ], 'Проверьте, что фильтр `name` ищет подстроку в названии.'
@@ -0,0 +1,131 @@
+import threading
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from api import autocomplete as autocomplete_module
+from api.autocomplete import autocomplete
+from api.cache import AUTOCOMPLETE_CATALOG
+from reviews.models import CatalogVersion
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Autocomplete:
+    url = '/api/v1/autocomplete/'
+
+    def complete(self, client, query, **params):
+        response = client.get(self.url, {'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.url}` доступен без токена.'
+        )
+        return response.json()
+
+    def refresh(self, client):
+        """Запускает фоновую перестройку индекса и ждёт её."""
+        self.complete(client, '')
+        autocomplete.join()
+
+    def test_01_autocomplete(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        data = self.complete(client, 'КРЕП')
+        assert data['titles'] == [
+            {'id': titles[1]['id'], 'name': 'Крепкий орешек'}
+        ], 'Проверьте, что автодополнение не зависит от регистра.'
+        assert self.complete(client, 'ореш')['titles'][0]['name'] == (
+            'Крепкий орешек'
+        ), 'Проверьте, что префикс ищется с начала любого слова.'
+        assert self.complete(client, 'ко')['genres'] == [
+            {'name': 'Комедия', 'slug': 'comedy'}
+        ]
+        assert self.complete(client, 'фил')['categories'] == [
+            {'name': 'Фильм', 'slug': 'films'}
+        ]
+        assert self.complete(client, '') == {
+            'titles': [], 'genres': [], 'categories': []
+        }
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Ёлки'}
+        )
+        self.refresh(client)
+        assert self.complete(client, 'елк')['titles'] == [
+            {'id': titles[0]['id'], 'name': 'Ёлки'}
+        ], (
+            'Проверьте, что индекс обновляется после изменения названия '
+            'и что `ё` и `е` не различаются.'
+        )
+        assert self.complete(client, 'терм')['titles'] == []
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Комикс', 'slug': 'comics'}
+        )
+        self.refresh(client)
+        assert len(self.complete(client, 'ком', limit=1)['genres']) == 1
+        assert len(self.complete(client, 'ком')['genres']) == 2
+
+    def test_02_background_rebuild(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        self.complete(client, 'креп')
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Ёлки'}
+        )
+
+        started = threading.Event()
+        release = threading.Event()
+        load_items = autocomplete_module.load_items
+
+        def slow_load_items():
+            started.set()
+            release.wait(5)
+            return load_items()
+
+        with mock.patch('api.autocomplete.load_items', slow_load_items):
+            assert self.complete(client, 'креп')['titles'] == [
+                {'id': titles[1]['id'], 'name': 'Крепкий орешек'}
+            ], (
+                'Проверьте, что пока индекс перестраивается, запросы '
+                'отвечают по прежнему индексу и не ждут.'
+            )
+            assert started.wait(5), (
+                'Проверьте, что индекс перестраивается в фоне.'
+            )
+            release.set()
+            autocomplete.join()
+        assert self.complete(client, 'елк')['titles'] == [
+            {'id': titles[1]['id'], 'name': 'Ёлки'}
+        ]
+
+    def test_03_shared_version(self, client, admin_client):
+        create_titles(admin_client)
+        self.complete(client, 'креп')
+        # Изменение в другом процессе видно только по версии в БД.
+        CatalogVersion.bump(AUTOCOMPLETE_CATALOG)
+        version = CatalogVersion.get(AUTOCOMPLETE_CATALOG)
+        self.refresh(client)
+        assert autocomplete.version == version, (
+            'Проверьте, что индекс перестраивается при смене версии '
+            'в БД, общей для всех процессов.'
+        )
+
+    def test_04_generate_data(self, client):
+        from reviews.models import Title
+
+        assert self.complete(client, 'а')['titles'] == []
+        call_command('generate_data', stdout=StringIO(), users=5,
+                     categories=2, genres=2, titles=5, reviews=5)
+        self.refresh(client)
+        name = Title.objects.values_list('name', flat=True).first()
+        assert self.complete(client, name)['titles'], (
+            'Проверьте, что после загрузки данных командой индекс '
+            'автодополнения перестраивается.'
+        )
+
+    def test_05_warm_up_closes_connection(self):
+        with mock.patch('api.autocomplete.connection') as connection:
+            autocomplete.warm_up()
+        connection.close.assert_called_once_with()
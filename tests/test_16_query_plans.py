@@ -0,0 +1,57 @@
+import re
+from itertools import combinations
+
+import pytest
+from django.db import connection
+
+FILTER_PARAMS = {
+    'category': 'films',
+    'genre': 'drama',
+    'year': '1994',
+    'name': 'орешек',
+    'search': 'орешек',
+}
+FILTER_COMBINATIONS = [
+    combination
+    for size in range(len(FILTER_PARAMS) + 1)
+    for combination in combinations(FILTER_PARAMS, size)
+]
+# Любой SCAN произведений, в том числе «USING INDEX», — просмотр всех
+# строк таблицы или индекса. Фильтр должен искать через SEARCH.
+TITLE_SCAN_RE = re.compile(r'^SCAN reviews_title\b')
+# Фильтры, которым разрешён просмотр, если нет других фильтров.
+SCANNED_FILTERS = {'name'}
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN из SQLite'
+)
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'combination', FILTER_COMBINATIONS, ids=lambda names: '+'.join(names)
+)
+def test_title_filters_use_indexes(combination):
+    from api.filters import TitleFilter
+    from api.views import TitleViewSet
+
+    params = {name: FILTER_PARAMS[name] for name in combination}
+    queryset = TitleFilter(params, queryset=TitleViewSet.queryset).qs
+    plan = explain(queryset[:10])
+    if not set(params) - SCANNED_FILTERS:
+        # Без фильтров первая страница читается по title_year_idx
+        # и останавливается на LIMIT. Поиск подстроки (icontains)
+        # индекс использовать не может: в порядке title_year_idx
+        # проверяются строки, пока не наберётся страница.
+        return
+    scans = [step for step in plan if TITLE_SCAN_RE.match(step)]
+    assert not scans, (
+        f'Запрос к `/api/v1/titles/` с фильтрами {params} просматривает '
+        f'все произведения: {scans}. План: {plan}'
+    )
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Metrics:
+    url = '/api/v1/_metrics'
+
+    def test_01_permissions(self, client, user_client, admin_client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{self.url}` недоступен без токена.'
+        )
+        assert user_client.get(self.url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.url}` недоступен обычному пользователю.'
+        )
+        response = admin_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что метрики отдаются в текстовом формате Prometheus.'
+        )
+
+    def test_02_histograms(self, client, admin_client):
+        from api.metrics import registry
+
+        create_titles(admin_client)
+        registry.reset()
+        for _ in range(3):
+            client.get('/api/v1/titles/')
+        client.get('/api/v1/genres/')
+
+        text = admin_client.get(self.url).content.decode()
+        labels = 'view="titles-list",method="GET"'
+        assert f'api_request_duration_seconds_count{{{labels}}} 3' in text, (
+            'Проверьте, что время ответа учитывается по имени маршрута.'
+        )
+        assert f'api_db_queries_sum{{{labels}}} 12' in text, (
+            'Проверьте, что учитывается количество SQL-запросов.'
+        )
+        assert f'api_db_queries_bucket{{{labels},le="5"}} 3' in text
+        assert f'api_db_queries_bucket{{{labels},le="3"}} 0' in text
+        assert f'api_db_duration_seconds_count{{{labels}}} 3' in text
+        assert 'view="genres-list",method="GET"' in text
+        assert '# TYPE api_request_duration_seconds histogram' in text
+
+    def test_03_bounded_labels(self, client, admin_client):
+        from api.metrics import registry
+
+        registry.reset()
+        client.generic('FOOBAR', '/api/v1/titles/')
+        client.generic('BAZ', '/api/v1/genres/')
+        client.get('/no/such/page/')
+        client.get('/another/missing/page/')
+
+        text = admin_client.get(self.url).content.decode()
+        assert 'FOOBAR' not in text and 'BAZ' not in text, (
+            'Проверьте, что неизвестные HTTP-методы не попадают в метки.'
+        )
+        assert (
+            'api_request_duration_seconds_count'
+            '{view="titles-list",method="other"} 1'
+        ) in text
+        assert (
+            'api_request_duration_seconds_count'
+            '{view="unresolved",method="GET"} 2'
+        ) in text, (
+            'Проверьте, что ненайденные маршруты учитываются под одной '
+            'меткой.'
+        )
@@ -0,0 +1,75 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def slow_query_log(settings, tmp_path, monkeypatch):
+    path = tmp_path / 'slow_queries.log'
+    handler = logging.FileHandler(path, encoding='utf-8')
+    monkeypatch.setattr(
+        logging.getLogger('api.slow_queries'), 'handlers', [handler]
+    )
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    yield path
+    handler.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18SlowQueries:
+
+    def test_01_log(self, client, admin_client, settings, slow_query_log):
+        settings.SLOW_QUERY_THRESHOLD_MS = None
+        create_titles(admin_client)
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        client.get('/api/v1/titles/')
+
+        entries = [
+            json.loads(line)
+            for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+        ]
+        assert len(entries) == 4, (
+            'Проверьте, что в журнал попадают запросы не быстрее порога.'
+        )
+        genres = next(
+            entry for entry in entries if 'reviews_title_genre' in entry['sql']
+        )
+        assert 'IN (...)' in genres['sql'], (
+            'Проверьте, что списки IN в запросе нормализуются.'
+        )
+        assert genres['params'] == ['int', 'int'], (
+            'Проверьте, что в журнал пишутся типы параметров, а не значения.'
+        )
+        assert all(
+            entry['source'].startswith(('api/', 'reviews/'))
+            for entry in entries
+        ), 'Проверьте, что для запроса указано место вызова в коде проекта.'
+
+    def test_02_report(self, client, admin_client, slow_query_log):
+        create_titles(admin_client)
+        for _ in range(2):
+            client.get('/api/v1/titles/')
+        with open(slow_query_log, 'a', encoding='utf-8') as log_file:
+            log_file.write('не JSON\n')
+
+        out = StringIO()
+        call_command(
+            'slow_queries', path=str(slow_query_log), top=2, stdout=out
+        )
+        report = out.getvalue()
+        assert 'Пропущено нераспознанных строк: 1.' in report
+        assert report.count(' мс всего, ') == 2, (
+            'Проверьте, что отчёт ограничен параметром --top.'
+        )
+
+        out = StringIO()
+        call_command(
+            'slow_queries', path=str(slow_query_log), group_by='source',
+            stdout=out,
+        )
+        assert 'api/' in out.getvalue()
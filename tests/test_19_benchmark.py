@@ -0,0 +1,52 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Benchmark:
+
+    def test_01_seed_and_run(self):
+        from benchmarks import load
+        from reviews.models import Comment, Review, Title
+
+        scale = load.Scale(
+            users=5, categories=2, genres=3, titles=12, genres_per_title=2,
+            reviews_per_title=2, comments_per_review=1,
+        )
+        load.seed(scale)
+        assert Title.objects.count() == 12
+        assert Review.objects.count() == 24
+        assert Comment.objects.count() == 24
+        assert not Title.objects.filter(rating=None).exists(), (
+            'Проверьте, что после загрузки пересчитываются рейтинги.'
+        )
+
+        results = load.run(scale, requests=3, warmup=1)
+        assert list(results) == [
+            scenario.name for scenario in load.SCENARIOS
+        ]
+        for name, result in results.items():
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert result['queries'] > 0, (
+                f'Проверьте, что для сценария {name} считаются запросы к БД.'
+            )
+
+    def test_02_compare(self):
+        from benchmarks.load import compare, percentile
+
+        assert percentile([1, 2, 3, 4], 50) == 2
+        assert percentile([1, 2, 3, 4], 99) == 4
+
+        baseline = {
+            'titles': {'p95_ms': 10.0, 'queries': 3},
+            'reviews': {'p95_ms': 10.0, 'queries': 3},
+        }
+        results = {
+            'titles': {'p95_ms': 11.0, 'queries': 3},
+            'reviews': {'p95_ms': 13.0, 'queries': 4},
+            'signup': {'p95_ms': 1.0, 'queries': 5},
+        }
+        lines, regressions = compare(results, baseline, max_regression=20)
+        assert len(lines) == 3
+        assert regressions == [
+            'reviews: p95 +30.0%', 'reviews: запросов к БД 3 → 4'
+        ], 'Проверьте, что регрессией считается рост p95 и числа запросов.'
@@ -0,0 +1,139 @@
+import csv
+import json
+import os
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Max
+
+SIZES = {
+    'users': 50, 'categories': 3, 'genres': 5, 'titles': 40, 'reviews': 600,
+    'comments_per_review': 1.0,
+}
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        return list(csv.reader(csv_file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20GenerateData:
+
+    def test_01_csv(self, tmp_path):
+        first, second = tmp_path / 'first', tmp_path / 'second'
+        call_command('generate_data', output=str(first), stdout=StringIO(),
+                     **SIZES)
+        call_command('generate_data', output=str(second), chunk_size=7,
+                     stdout=StringIO(), **SIZES)
+        for file in ('titles.csv', 'genre_title.csv', 'review.csv',
+                     'comments.csv'):
+            assert read_csv(first / file) == read_csv(second / file), (
+                'Проверьте, что данные воспроизводимы при одном seed '
+                'и не зависят от размера куска.'
+            )
+        reviews = read_csv(first / 'review.csv')
+        assert reviews[0] == [
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ]
+        assert len(reviews) == SIZES['reviews'] + 1
+
+        from reviews.models import Comment, Review, Title
+
+        call_command('import_data', path=str(first), stdout=StringIO())
+        assert Review.objects.count() == SIZES['reviews']
+        assert Comment.objects.count() == len(
+            read_csv(first / 'comments.csv')
+        ) - 1
+        assert not Title.objects.annotate(
+            genres=Count('genre')
+        ).filter(genres=0).exists(), (
+            'Проверьте, что у каждого произведения есть жанры.'
+        )
+
+    def test_02_database(self):
+        from reviews.models import Review, Title
+
+        call_command('generate_data', stdout=StringIO(), **SIZES)
+        assert Review.objects.count() == SIZES['reviews']
+        counts = Title.objects.aggregate(
+            most=Max('rating_count'), total=Count('id')
+        )
+        assert counts['most'] > 3 * SIZES['reviews'] / counts['total'], (
+            'Проверьте, что отзывы распределены по произведениям '
+            'неравномерно.'
+        )
+        assert not Title.objects.filter(
+            rating_count__gt=0, rating=None
+        ).exists(), 'Проверьте, что после генерации пересчитаны рейтинги.'
+
+    def test_03_checkpoint_chunk_size(self, tmp_path):
+        from reviews.models import User
+
+        call_command('generate_data', output=str(tmp_path), stdout=StringIO(),
+                     **SIZES)
+        checkpoint = tmp_path / 'checkpoint.json'
+        checkpoint.write_text(json.dumps({
+            'chunk_size': 7,
+            'files': {'users.csv': {'done': False, 'chunks': [0, 1]}},
+        }))
+        with pytest.raises(CommandError):
+            call_command('import_data', path=str(tmp_path), chunk_size=10,
+                         checkpoint=str(checkpoint), stdout=StringIO())
+        assert not User.objects.exists(), (
+            'Проверьте, что загрузка не продолжается по контрольным '
+            'точкам с другим размером куска.'
+        )
+
+        checkpoint.write_text(json.dumps({'chunk_size': 7, 'files': {}}))
+        call_command('import_data', path=str(tmp_path), chunk_size=7,
+                     checkpoint=str(checkpoint), stdout=StringIO())
+        assert User.objects.count() == SIZES['users'], (
+            'Проверьте, что загрузка продолжается при том же размере куска.'
+        )
+        assert not checkpoint.exists()
+
+    def test_04_import_changes_etag(self, client, tmp_path):
+        call_command('generate_data', output=str(tmp_path), stdout=StringIO(),
+                     **SIZES)
+        urls = ('/api/v1/titles/', '/api/v1/genres/')
+        etag = client.get(urls[0])['ETag']
+        genres = client.get(urls[1]).json()
+        call_command('import_data', path=str(tmp_path), stdout=StringIO())
+        assert client.get(
+            urls[0], HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что после import_data ETag списка произведений '
+            'меняется.'
+        )
+        assert client.get(urls[1]).json() != genres, (
+            'Проверьте, что после import_data кэш справочников сброшен.'
+        )
+
+    def test_05_default_checkpoint_path(self, tmp_path):
+        from reviews.management.commands.import_data import (
+            get_checkpoint_path)
+
+        path = get_checkpoint_path(str(tmp_path))
+        assert os.path.dirname(path) == tempfile.gettempdir(), (
+            'Проверьте, что контрольные точки по умолчанию пишутся '
+            'во временный каталог, а не в каталог CSV.'
+        )
+        assert path != get_checkpoint_path(str(tmp_path / 'other'))
+
+    def test_06_no_comments(self):
+        from reviews.models import Comment, Review
+
+        call_command('generate_data', stdout=StringIO(),
+                     **{**SIZES, 'comments_per_review': 0})
+        assert Review.objects.count() == SIZES['reviews']
+        assert not Comment.objects.exists(), (
+            'Проверьте, что `--comments-per-review 0` генерирует данные '
+            'без комментариев.'
+        )
+        with pytest.raises(CommandError):
+            call_command('generate_data', stdout=StringIO(),
+                         **{**SIZES, 'comments_per_review': -1})
@@ -0,0 +1,146 @@
+import smtplib
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+FAILING_EMAIL = 'fail@yamdb.fake'
+BROKEN_EMAIL = 'broken@yamdb.fake'
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+
+    def send_messages(self, messages):
+        for message in messages:
+            if FAILING_EMAIL in message.to:
+                raise smtplib.SMTPRecipientsRefused({FAILING_EMAIL: ''})
+        return super().send_messages(messages)
+
+
+class BrokenBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        for message in messages:
+            if BROKEN_EMAIL in message.to:
+                raise ValueError('Некорректное письмо')
+        return super().send_messages(messages)
+
+
+def signup(client, username):
+    response = client.post('/api/v1/auth/signup/', data={
+        'username': username, 'email': f'{username}@yamdb.fake'
+    })
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Outbox:
+
+    def test_01_worker(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        signup(client, 'queued')
+        assert mail.outbox == [], (
+            'Проверьте, что signup не отправляет письмо в запросе.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipients == 'queued@yamdb.fake'
+        assert email.sent_at is None
+
+        call_command('send_outbox', once=True, stdout=StringIO())
+        assert [message.to for message in mail.outbox] == [
+            ['queued@yamdb.fake']
+        ], 'Проверьте, что send_outbox отправляет письма из очереди.'
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.attempts == 1
+
+        call_command('send_outbox', once=True, stdout=StringIO())
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_batch_and_retry(self, settings):
+        from api import outbox
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        settings.EMAIL_BACKEND = 'tests.test_21_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        for address in ('one@yamdb.fake', FAILING_EMAIL, 'two@yamdb.fake'):
+            outbox.enqueue('Тема', 'Текст', 'yamdb@yamdb.ru', [address])
+
+        assert outbox.deliver() == (2, 1)
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+        failed = OutgoingEmail.objects.get(recipients=FAILING_EMAIL)
+        assert failed.sent_at is None
+        assert failed.attempts == 1
+        assert 'SMTPRecipientsRefused' in failed.last_error
+        assert failed.send_after > timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_BACKOFF - 5
+        ), 'Проверьте, что повтор откладывается.'
+        assert outbox.deliver() == (0, 0)
+
+        assert outbox.get_backoff(1) == timedelta(
+            seconds=settings.EMAIL_OUTBOX_BACKOFF
+        )
+        assert outbox.get_backoff(3) == 4 * outbox.get_backoff(1)
+
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        assert outbox.deliver() == (0, 1)
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        assert outbox.deliver() == (0, 0), (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток '
+            'письмо больше не отправляется.'
+        )
+
+    def test_03_thread(self, client, settings):
+        settings.EMAIL_OUTBOX_MODE = 'thread'
+        signup(client, 'threaded')
+        deadline = time.monotonic() + 5
+        while not mail.outbox and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [message.to for message in mail.outbox] == [
+            ['threaded@yamdb.fake']
+        ], 'Проверьте, что в режиме thread письмо отправляется в фоне.'
+
+    def test_04_unexpected_error(self, settings):
+        from api import outbox
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        settings.EMAIL_BACKEND = 'tests.test_21_outbox.BrokenBackend'
+        for address in (BROKEN_EMAIL, 'one@yamdb.fake'):
+            outbox.enqueue('Тема', 'Текст', 'yamdb@yamdb.ru', [address])
+
+        assert outbox.deliver() == (1, 1), (
+            'Проверьте, что любая ошибка отправки письма не мешает '
+            'остальным письмам пачки.'
+        )
+        assert [message.to for message in mail.outbox] == [
+            ['one@yamdb.fake']
+        ]
+        broken = OutgoingEmail.objects.get(recipients=BROKEN_EMAIL)
+        assert broken.sent_at is None
+        assert broken.attempts == 1
+        assert 'ValueError' in broken.last_error
+        assert broken.send_after > timezone.now(), (
+            'Проверьте, что письмо с ошибкой не задерживает очередь.'
+        )
+        assert outbox.deliver() == (0, 0), (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
@@ -0,0 +1,166 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import BulkSignupSerializer, ConfirmationCodeSerializer
+from reviews.models import User
+
+
+def racing(method, **fields):
+    """Метод проверки, после которого «параллельный» запрос один раз
+    создаёт пользователя с fields."""
+    created = []
+
+    def wrapper(self, data):
+        data = method(self, data)
+        if not created:
+            created.append(User.objects.create(**fields))
+        return data
+    return wrapper
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BulkSignup:
+    url = '/api/v1/auth/signup/bulk/'
+
+    def test_01_signup_validation_query(self, user):
+        from api.serializers import ConfirmationCodeSerializer
+
+        for data, valid in (
+            ({'username': 'newuser', 'email': 'new@yamdb.fake'}, True),
+            ({'username': user.username, 'email': user.email}, True),
+            ({'username': user.username, 'email': 'other@yamdb.fake'}, False),
+            ({'username': 'otheruser', 'email': user.email}, False),
+        ):
+            serializer = ConfirmationCodeSerializer(data=data)
+            with CaptureQueriesContext(connection) as queries:
+                assert serializer.is_valid() == valid, data
+            assert len(queries) == 1, (
+                'Проверьте, что валидация signup выполняет один запрос к БД.'
+            )
+        serializer = ConfirmationCodeSerializer(
+            data={'username': user.username, 'email': user.email}
+        )
+        serializer.is_valid()
+        assert serializer.user == user
+
+    def test_02_permissions(self, client, user_client, admin_client):
+        data = [{'username': 'newuser', 'email': 'new@yamdb.fake'}]
+        assert client.post(
+            self.url, data=data, content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            self.url, data=data, format='json'
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.url}` доступен только администратору.'
+        )
+
+    def test_03_bulk_signup(self, admin_client, user, django_user_model,
+                            settings):
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        mail.outbox.clear()
+        data = [
+            {'username': f'Partner{idx}', 'email': f'partner{idx}@yamdb.fake'}
+            for idx in range(1200)
+        ]
+        data.append({'username': user.username, 'email': user.email})
+        data.append({'username': 'partner0', 'email': 'partner0@yamdb.fake'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                self.url, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.OK, response.json()
+        assert response.json() == {'created': 1200, 'existing': 1}
+        assert django_user_model.objects.filter(
+            username__startswith='partner'
+        ).count() == 1200, (
+            'Проверьте, что username приводится к нижнему регистру.'
+        )
+        assert len(queries) < 60, (
+            'Проверьте, что пользователи и письма создаются пачками.'
+        )
+        call_command('send_outbox', once=True, stdout=StringIO())
+        assert len(mail.outbox) == 1201, (
+            'Проверьте, что код отправляется каждому пользователю из списка.'
+        )
+
+    def test_04_bulk_signup_errors(self, admin_client, user,
+                                   django_user_model):
+        users_before = django_user_model.objects.count()
+        data = [
+            {'username': 'fine', 'email': 'fine@yamdb.fake'},
+            {'username': user.username, 'email': 'other@yamdb.fake'},
+            {'username': 'twice', 'email': 'one@yamdb.fake'},
+            {'username': 'twice', 'email': 'two@yamdb.fake'},
+            {'username': 'other', 'email': user.email.upper()},
+        ]
+        response = admin_client.post(
+            self.url, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == len(data), (
+            'Проверьте, что ошибки возвращаются для каждого элемента списка.'
+        )
+        assert errors[0] == {}
+        assert 'username' in errors[1]
+        assert 'username' in errors[2] and 'username' in errors[3]
+        assert 'email' in errors[4]
+
+        response = admin_client.post(self.url, data=[
+            {'username': 'fine', 'email': 'fine@yamdb.fake'},
+            {'username': 'me', 'email': 'me@yamdb.fake'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()[0] == {}
+        assert 'username' in response.json()[1]
+        assert django_user_model.objects.count() == users_before, (
+            'Проверьте, что при ошибках пользователи не создаются.'
+        )
+
+    @pytest.mark.parametrize('fields, message', [
+        ({'username': 'racer', 'email': 'other@yamdb.fake'},
+         'Такое имя уже зарегистрировано'),
+        ({'username': 'other', 'email': 'racer@yamdb.fake'},
+         'Такой e-mail уже зарегистрирован'),
+    ])
+    def test_05_signup_race(self, client, fields, message):
+        with mock.patch.object(
+            ConfirmationCodeSerializer, 'validate', racing(
+                ConfirmationCodeSerializer.validate, **fields
+            )
+        ):
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': 'racer', 'email': 'racer@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что если параллельный запрос занял только '
+            'username или только email, signup отвечает ошибкой 400.'
+        )
+        assert response.json() == {'non_field_errors': [message]}
+
+    def test_06_bulk_signup_race(self, admin_client):
+        with mock.patch.object(
+            BulkSignupSerializer, 'validate_users', racing(
+                BulkSignupSerializer.validate_users,
+                username='racer', email='other@yamdb.fake'
+            )
+        ):
+            response = admin_client.post(self.url, data=[
+                {'username': 'fine', 'email': 'fine@yamdb.fake'},
+                {'username': 'racer', 'email': 'racer@yamdb.fake'},
+            ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что конфликт с параллельной регистрацией '
+            'возвращает ошибку 400, а не 500.'
+        )
+        errors = response.json()
+        assert errors[0] == {} and 'username' in errors[1]
+        assert not User.objects.filter(username='fine').exists()
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.confirmation import CONFIRMATION_CODE_FIELDS, set_confirmation_code
+from reviews.models import User
+
+
+def get_client(user):
+    code = set_confirmation_code(user)
+    user.save(update_fields=CONFIRMATION_CODE_FIELDS)
+    response = APIClient().post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': code,
+    })
+    assert response.status_code == HTTPStatus.OK
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client, AccessToken(response.json()['token'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23JWTClaims:
+
+    def test_01_claims(self, admin):
+        _, token = get_client(admin)
+        assert (
+            token['username'], token['role'], token['is_staff'],
+            token['is_superuser']
+        ) == (admin.username, 'admin', False, False), (
+            'Проверьте, что имя, роль и флаги пользователя записываются '
+            'в токен.'
+        )
+
+    def test_02_no_user_query(self, admin):
+        client, _ = get_client(admin)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 2, (
+            'Проверьте, что аутентификация по JWT не загружает '
+            'пользователя из БД: остаются только count и список.'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == admin.username
+        assert len(queries) == 1, (
+            'Проверьте, что поля не из токена загружаются одним запросом.'
+        )
+
+    def test_03_role_change(self, admin, user):
+        admin_client, _ = get_client(admin)
+        user_client, _ = get_client(user)
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли старый токен не принимается.'
+        )
+        user.refresh_from_db()
+        user_client, token = get_client(user)
+        assert token['role'] == 'moderator'
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен удалённого пользователя не принимается.'
+
+    def test_04_stale_state_not_saved(self, admin):
+        client, _ = get_client(admin)
+        client.get('/api/v1/users/me/')
+        # Понижение в другом процессе: кэш этого процесса не сброшен.
+        User.objects.filter(pk=admin.pk).update(role='user', token_version=2)
+        response = client.patch('/api/v1/users/me/', data={'bio': 'hi'})
+        assert response.status_code == HTTPStatus.OK
+        assert User.objects.filter(pk=admin.pk).values_list(
+            'role', 'token_version', 'bio'
+        ).get() == ('user', 2, 'hi'), (
+            'Проверьте, что PATCH /users/me/ не записывает в БД роль '
+            'и версию токенов из кэша процесса.'
+        )
@@ -0,0 +1,117 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.confirmation import CONFIRMATION_CODE_FIELDS, set_confirmation_code
+from api.lru import LRUCache
+
+
+def get_client(user):
+    code = set_confirmation_code(user)
+    user.save(update_fields=CONFIRMATION_CODE_FIELDS)
+    response = APIClient().post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': code,
+    })
+    assert response.status_code == HTTPStatus.OK
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client, AccessToken(response.json()['token'])
+
+
+class Test24LRUCache:
+
+    def test_01_eviction(self):
+        cache = LRUCache(maxsize=2, timeout=60)
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        cache.get(1)
+        cache.set(3, 'c')
+        assert (cache.get(1), cache.get(2), cache.get(3)) == ('a', None, 'c'), (
+            'Проверьте, что при переполнении вытесняется самая давно '
+            'использованная запись.'
+        )
+        assert len(cache) == 2
+
+    def test_02_timeout(self):
+        cache = LRUCache(maxsize=2, timeout=60)
+        with mock.patch('api.lru.time.monotonic', return_value=100):
+            cache.set(1, 'a')
+        with mock.patch('api.lru.time.monotonic', return_value=159):
+            assert cache.get(1) == 'a'
+        with mock.patch('api.lru.time.monotonic', return_value=161):
+            assert cache.get(1) is None, (
+                'Проверьте, что просроченная запись не возвращается.'
+            )
+        assert len(cache) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TokenVersion:
+
+    def test_01_role_change_bumps_version(self, admin, user):
+        _, token = get_client(user)
+        assert token['token_version'] == 1, (
+            'Проверьте, что версия токенов записывается в токен.'
+        )
+        admin_client, _ = get_client(admin)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'user'}
+        )
+        user.refresh_from_db()
+        assert user.token_version == 3, (
+            'Проверьте, что каждая смена роли увеличивает версию токенов.'
+        )
+
+    def test_02_old_token_revoked(self, admin, user):
+        admin_client, _ = get_client(admin)
+        user_client, _ = get_client(user)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'user'}
+        )
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен отозван, даже если роль вернули обратно.'
+        )
+        assert response.json()['code'] == 'token_outdated'
+        user.refresh_from_db()
+        user_client, _ = get_client(user)
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_03_token_without_version(self, admin, user, user_client):
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что токены без версии принимаются до смены роли.'
+        admin_client, _ = get_client(admin)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли отзывает и токены без версии.'
+
+    def test_04_other_fields_keep_version(self, admin, user):
+        admin_client, _ = get_client(admin)
+        user_client, _ = get_client(user)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/',
+            data={'bio': 'Новая биография', 'role': 'user'},
+        )
+        user.refresh_from_db()
+        assert user.token_version == 1, (
+            'Проверьте, что версия растёт только при смене роли.'
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
@@ -0,0 +1,113 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.throttling import LocalBuckets
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+def signup(client, idx, username=None):
+    return client.post(SIGNUP_URL, data={
+        'username': username or f'user{idx}',
+        'email': f'user{idx}@yamdb.fake',
+    })
+
+
+class Test25LocalBuckets:
+
+    def test_01_burst_and_refill(self):
+        buckets = LocalBuckets(maxsize=10)
+        now = [100.0]
+        buckets.timer = lambda: now[0]
+        assert [buckets.consume('key', 3, 0.5) for _ in range(3)] == [0] * 3
+        assert buckets.consume('key', 3, 0.5) == pytest.approx(2), (
+            'Проверьте, что пустое ведро возвращает время до нового токена.'
+        )
+        now[0] += 2
+        assert buckets.consume('key', 3, 0.5) == 0, (
+            'Проверьте, что ведро пополняется со временем.'
+        )
+        now[0] += 3600
+        assert [buckets.consume('key', 3, 0.5) for _ in range(4)][-1] > 0, (
+            'Проверьте, что ведро не пополняется сверх вместимости.'
+        )
+
+    def test_02_maxsize(self):
+        buckets = LocalBuckets(maxsize=2)
+        for key in ('a', 'b', 'c'):
+            buckets.consume(key, 1, 1)
+        assert list(buckets.buckets) == ['b', 'c'], (
+            'Проверьте, что число вёдер ограничено.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Throttling:
+
+    @pytest.fixture(params=['local', 'cache'])
+    def backend(self, request, settings):
+        settings.THROTTLE_BACKEND = request.param
+        return request.param
+
+    def test_01_signup_username(self, client, settings, backend):
+        settings.THROTTLE_RATES = {'signup_username': '2/min'}
+        assert signup(client, 1).status_code == HTTPStatus.OK
+        assert signup(client, 1).status_code == HTTPStatus.OK
+        response = signup(client, 1, username='USER1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частота регистрации ограничена по username '
+            'без учёта регистра.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert signup(client, 2).status_code == HTTPStatus.OK, (
+            'Проверьте, что ограничение по username не мешает другим.'
+        )
+
+    def test_02_signup_ip(self, client, settings, backend):
+        settings.THROTTLE_RATES = {'signup_ip': '3/min'}
+        for idx in range(3):
+            assert signup(client, idx).status_code == HTTPStatus.OK
+        assert signup(client, 3).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), 'Проверьте, что частота регистрации ограничена по IP.'
+        response = client.post(
+            SIGNUP_URL, data={'username': 'user4', 'email': 'u4@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.1',
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что у каждого IP своё ограничение.'
+        )
+
+    def test_03_spoofed_forwarded_for(self, client, settings):
+        settings.THROTTLE_RATES = {'signup_ip': '2/min'}
+        for idx in range(2):
+            assert signup(client, idx).status_code == HTTPStatus.OK
+        response = client.post(
+            SIGNUP_URL, data={'username': 'user2', 'email': 'u2@yamdb.fake'},
+            HTTP_X_FORWARDED_FOR='10.0.0.2',
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подделка X-Forwarded-For не обходит '
+            'ограничение по IP.'
+        )
+
+    def test_04_token(self, client, settings, user):
+        settings.THROTTLE_RATES = {'token_ip': '10/min', 'token_username': '2/min'}
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            assert client.post(TOKEN_URL, data=data).status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+        assert client.post(TOKEN_URL, data=data).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), 'Проверьте, что подбор кода подтверждения ограничен.'
+
+    def test_05_disabled(self, client, settings):
+        settings.THROTTLE_RATES = {}
+        for idx in range(30):
+            assert signup(client, 1).status_code == HTTPStatus.OK, (
+                'Проверьте, что без скорости в THROTTLE_RATES запросы '
+                'не ограничиваются.'
+            )
@@ -0,0 +1,108 @@
+import hashlib
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+def get_code(message):
+    return message.body.rsplit(': ', 1)[-1]
+
+
+def signup(client, username='new_user'):
+    response = client.post(SIGNUP_URL, data={
+        'username': username, 'email': f'{username}@yamdb.fake'
+    })
+    assert response.status_code == HTTPStatus.OK
+    return get_code(mail.outbox[-1])
+
+
+def get_token(client, code, username='new_user'):
+    return client.post(TOKEN_URL, data={
+        'username': username, 'confirmation_code': code
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ConfirmationCodes:
+
+    def test_01_hashed_single_use(self, client):
+        code = signup(client)
+        user = User.objects.get(username='new_user')
+        assert user.confirmation_code == (
+            hashlib.sha256(code.encode()).hexdigest()
+        ), 'Проверьте, что в БД хранится хеш кода, а не сам код.'
+        assert user.confirmation_code_expires > timezone.now()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = get_token(client, code)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 2, (
+            'Проверьте, что код проверяется одним запросом пользователя '
+            'и гасится одним UPDATE.'
+        )
+        assert get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что код подтверждения одноразовый.'
+
+    def test_02_expired(self, client):
+        code = signup(client)
+        User.objects.filter(username='new_user').update(
+            confirmation_code_expires=timezone.now() - timedelta(seconds=1)
+        )
+        assert get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что просроченный код не принимается.'
+
+    def test_03_new_code_replaces_old(self, client):
+        old_code = signup(client)
+        new_code = signup(client)
+        assert get_token(client, old_code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что новый код отменяет прежний.'
+        assert get_token(client, new_code).status_code == HTTPStatus.OK
+
+    def test_04_bulk_signup_codes(self, admin_client, client, user):
+        response = admin_client.post('/api/v1/auth/signup/bulk/', data=[
+            {'username': user.username, 'email': user.email},
+            {'username': 'bulk_user', 'email': 'bulk_user@yamdb.fake'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        codes = {
+            message.to[0]: get_code(message) for message in mail.outbox
+        }
+        for username, email in (
+            (user.username, user.email), ('bulk_user', 'bulk_user@yamdb.fake')
+        ):
+            assert get_token(client, codes[email], username).status_code == (
+                HTTPStatus.OK
+            ), 'Проверьте, что коды из массовой регистрации действуют.'
+
+    def test_05_clear_command(self, client):
+        for idx in range(3):
+            signup(client, f'user{idx}')
+        signup(client, 'fresh')
+        User.objects.exclude(username='fresh').update(
+            confirmation_code_expires=timezone.now() - timedelta(seconds=1)
+        )
+        call_command('clear_confirmation_codes', batch_size=2)
+        assert list(
+            User.objects.filter(
+                confirmation_code__isnull=False
+            ).values_list('username', flat=True)
+        ) == ['fresh'], (
+            'Проверьте, что команда стирает только просроченные коды.'
+        )
+        assert not User.objects.filter(
+            confirmation_code_expires__isnull=False
+        ).exclude(username='fresh').exists()